@@ -1,34 +1,178 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
+from werkzeug.exceptions import HTTPException
 from src.models.assessment import db, Assessment, LibraryContent, NewsletterSubscription
 from src.models.user import User
 from src.ai.enhanced_query_processor import enhanced_query_processor
-from src.ai.ayurveda_astrology_kb import ayurveda_astrology_kb
+from src.ai.ayurveda_astrology_kb import ayurveda_astrology_kb, KB_VERSION
+from bisect import bisect_right
 from datetime import datetime, timedelta
+import hashlib
 import json
 import os
+import time
+import orjson
 
 ai_query_bp = Blueprint('ai_query', __name__)
 
+# Season for each month, indexed by datetime.month (index 0 unused)
+_SEASONS = (None, "winter", "winter", "spring", "spring", "spring", "summer",
+            "summer", "summer", "fall", "fall", "fall", "winter")
+
+# The season only changes on a date boundary, so remember it for the current day
+_season_cache = {'date': None, 'value': None}
+
 def get_current_season():
     """Determine current season based on month"""
-    month = datetime.now().month
-    if month in [3, 4, 5]:
-        return "spring"
-    elif month in [6, 7, 8]:
-        return "summer"
-    elif month in [9, 10, 11]:
-        return "fall"
-    else:
-        return "winter"
+    today = datetime.now().date()
+    if _season_cache['date'] != today:
+        _season_cache.update(date=today, value=_SEASONS[today.month])
+    return _season_cache['value']
+
+# (epoch second, ISO string) for the last timestamp handed out
+_query_timestamp = (0, None)
+
+def get_query_timestamp():
+    """Current local time in ISO format at one-second resolution, formatted once per second"""
+    global _query_timestamp
+    second = int(time.time())
+    if _query_timestamp[0] != second:
+        _query_timestamp = (second, datetime.fromtimestamp(second).isoformat())
+    return _query_timestamp[1]
+
+# Life stages and the ages at which each following stage begins
+_LIFE_STAGES = ("childhood", "youth", "maturity")
+_LIFE_STAGE_BOUNDS = (16, 50)
 
 def get_life_stage(age):
-    """Determine life stage based on age"""
-    if age < 16:
-        return "childhood"
-    elif age < 50:
-        return "youth"
-    else:
-        return "maturity"
+    """Determine life stage based on age, or None when the age is unknown"""
+    if not age:
+        return None
+    return _LIFE_STAGES[bisect_right(_LIFE_STAGE_BOUNDS, age)]
+
+# Error bodies with fixed content, serialized once at import
+_ERR_INVALID_JSON = orjson.dumps({'success': False, 'error': 'Invalid JSON body'})
+_ERR_QUERY_REQUIRED = orjson.dumps({'success': False, 'error': 'Query is required'})
+_ERR_EMAIL_REQUIRED = orjson.dumps({'success': False, 'error': 'Email is required'})
+_ERR_SUBSCRIPTION_REQUIRED = orjson.dumps({
+    'success': False,
+    'error': 'Subscription required',
+    'message': 'Please subscribe to access AI guidance from Dr. Helen Thomas DC'
+})
+
+def _prebuilt_response(body, status):
+    """
+    Wrap pre-serialized JSON in a new response. A fresh Response is built each
+    time because after_request hooks (e.g. CORS) add headers to the object.
+    """
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+@ai_query_bp.errorhandler(Exception)
+def handle_internal_error(e):
+    """Return the blueprint's JSON error envelope for any unhandled exception"""
+    if isinstance(e, HTTPException):
+        return e
+    return jsonify({
+        'success': False,
+        'error': 'Internal server error',
+        'message': str(e)
+    }), 500
+
+def _json_body():
+    """Parse the request body with orjson, treating an empty body as an empty object"""
+    return orjson.loads(request.get_data(cache=False) or b'{}')
+
+# Short-lived cache of active-subscription lookups, keyed by the normalized
+# (stripped, lowercased) email that subscribe_newsletter stores:
+# email -> (expires_at, subscribed, subscription_date)
+_SUBSCRIPTION_CACHE_TTL = 60
+_SUBSCRIPTION_CACHE_MAX_SIZE = 10000
+_subscription_cache = {}
+
+def get_subscription(email):
+    """Return (subscribed, subscription_date) for a normalized email, cached for a short TTL"""
+    now = time.monotonic()
+    entry = _subscription_cache.get(email)
+    if entry is None or entry[0] <= now:
+        row = (db.session.query(NewsletterSubscription.created_at)
+               .filter_by(email=email, is_active=True)
+               .first())
+        if len(_subscription_cache) >= _SUBSCRIPTION_CACHE_MAX_SIZE:
+            _subscription_cache.clear()
+        entry = (now + _SUBSCRIPTION_CACHE_TTL, row is not None, row.created_at if row else None)
+        _subscription_cache[email] = entry
+    return entry[1], entry[2]
+
+def remember_subscription(email, subscription_date):
+    """Record a just-committed active subscription so the next check skips the query"""
+    if len(_subscription_cache) >= _SUBSCRIPTION_CACHE_MAX_SIZE:
+        _subscription_cache.clear()
+    _subscription_cache[email] = (time.monotonic() + _SUBSCRIPTION_CACHE_TTL, True, subscription_date)
+
+def is_subscribed(email):
+    """Check whether an email has an active subscription"""
+    return get_subscription(email)[0]
+
+def load_user_context(user_id):
+    """
+    Fetch the user's age and their latest assessment's primary dosha with a
+    single query. Returns None when there is no such user; primary_dosha is
+    None when the user has no assessments.
+    
+    The dosha is a correlated LIMIT 1 subquery over (user_id, created_at), so
+    an index on those columns answers it with one seek instead of joining and
+    sorting every assessment the user has.
+    """
+    latest_dosha = (db.session.query(Assessment.primary_dosha)
+                    .filter(Assessment.user_id == User.id)
+                    .order_by(Assessment.created_at.desc())
+                    .limit(1)
+                    .correlate(User)
+                    .scalar_subquery())
+    
+    return (db.session.query(User.age, latest_dosha.label('primary_dosha'))
+            .filter(User.id == user_id)
+            .first())
+
+# Knowledge base GET responses depend only on their URL params and the KB version
+_KB_CACHE_CONTROL = 'public, max-age=3600'
+
+def _kb_etag(*parts):
+    """Short BLAKE2b digest of the endpoint, its params and the KB version"""
+    key = '|'.join(part or '' for part in (*parts, KB_VERSION))
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+def _not_modified(etag):
+    """Return an empty 304 if the client already holds this ETag, else None"""
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = _KB_CACHE_CONTROL
+        return response
+    return None
+
+def _cacheable(response, etag):
+    """Attach the ETag and cache headers to a successful KB response"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = _KB_CACHE_CONTROL
+    return response
+
+# Fields that are identical on every generated response, built once at import
+_STATIC_RESPONSE_FIELDS = {
+    "source": "Dr. Helen Thomas DC - Enhanced NanoSutracore System",
+    "clinical_authority": "Dr. Helen Thomas DC - 44 years clinical experience",
+    "warning": "This guidance is for educational purposes. Always consult your healthcare provider for medical advice.",
+    "system": "Enhanced Query Processor with Ayurvedic & Astrological Intelligence"
+}
+
+_STATIC_FALLBACK_FIELDS = {
+    "source": "Healing Airwaves Clinical Experience - Fallback Mode",
+    "personalized": True,
+    "clinical_authority": "Dr. Helen Thomas DC - 44 years experience",
+    "recommendations": ("Take constitutional assessment", "Consider pulse diagnosis", "Follow seasonal guidelines"),
+    "herbs_supplements": ("Triphala", "Ashwagandha", "Turmeric"),
+    "lifestyle_tips": ("Maintain regular routine", "Eat according to constitution", "Practice daily meditation"),
+    "warning": "This guidance is for educational purposes. Always consult your healthcare provider for medical advice."
+}
 
 def generate_ai_response(query, user_constitution=None, user_age=None, current_season=None, symptoms=None, context=None):
     """
@@ -56,14 +200,9 @@ def generate_ai_response(query, user_constitution=None, user_age=None, current_s
             response["answer"] = f"Thank you for your question about {query}. Let me provide guidance based on Ayurvedic principles and my clinical experience."
         
         # Add standard fields for compatibility
-        response.update({
-            "source": "Dr. Helen Thomas DC - Enhanced NanoSutracore System",
-            "constitution_specific": user_constitution is not None,
-            "personalized": bool(user_constitution),
-            "clinical_authority": "Dr. Helen Thomas DC - 44 years clinical experience",
-            "warning": "This guidance is for educational purposes. Always consult your healthcare provider for medical advice.",
-            "system": "Enhanced Query Processor with Ayurvedic & Astrological Intelligence"
-        })
+        response |= _STATIC_RESPONSE_FIELDS
+        response["constitution_specific"] = user_constitution is not None
+        response["personalized"] = bool(user_constitution)
         
         return response
         
@@ -71,234 +210,193 @@ def generate_ai_response(query, user_constitution=None, user_age=None, current_s
         # Fallback response if enhanced processor fails
         return {
             "answer": f"I understand your question about {query}. From my 44 years of clinical experience with Ayurveda, let me share some guidance. The key is always to understand your constitution and current imbalances.",
-            "source": "Healing Airwaves Clinical Experience - Fallback Mode",
             "constitution_specific": user_constitution is not None,
-            "personalized": True,
-            "clinical_authority": "Dr. Helen Thomas DC - 44 years experience",
-            "recommendations": ["Take constitutional assessment", "Consider pulse diagnosis", "Follow seasonal guidelines"],
-            "herbs_supplements": ["Triphala", "Ashwagandha", "Turmeric"],
-            "lifestyle_tips": ["Maintain regular routine", "Eat according to constitution", "Practice daily meditation"],
-            "warning": "This guidance is for educational purposes. Always consult your healthcare provider for medical advice.",
+            **_STATIC_FALLBACK_FIELDS,
             "error": f"Enhanced processor temporarily unavailable: {str(e)}"
         }
 
+# Avatar speaking constants shared by every script; only serialized, never modified
+_AVATAR_VOICE_SETTINGS = {
+    "stability": 0.75,
+    "similarity_boost": 0.85,
+    "style": 0.65,
+    "use_speaker_boost": True
+}
+_AVATAR_EMPHASIS_WORDS = ("constitution", "dosha", "Ayurveda", "healing", "balance")
+
 @ai_query_bp.route('/ask', methods=['POST'])
 def ask_ai():
     """Handle AI query requests with subscription validation"""
     try:
-        data = request.get_json()
-        query = data.get('query', '').strip()
-        email = data.get('email')
-        user_id = data.get('user_id')
-        
-        if not query:
-            return jsonify({'success': False, 'error': 'Query is required'}), 400
-        
-        # Check subscription status
-        subscription = None
-        if email:
-            subscription = NewsletterSubscription.query.filter_by(email=email, is_active=True).first()
-        
-        if not subscription:
-            return jsonify({
-                'success': False, 
-                'error': 'Subscription required',
-                'message': 'Please subscribe to access AI guidance from Dr. Helen Thomas DC'
-            }), 403
-        
-        # Get user's constitutional data if available
-        user_constitution = None
-        user_age = None
-        
-        if user_id:
-            user = User.query.get(user_id)
-            if user:
-                user_age = user.age
-                # Get latest assessment
-                latest_assessment = Assessment.query.filter_by(user_id=user_id).order_by(Assessment.created_at.desc()).first()
-                if latest_assessment:
-                    user_constitution = latest_assessment.primary_dosha
-        
-        # Generate AI response using enhanced processor
-        current_season = get_current_season()
-        life_stage = get_life_stage(user_age) if user_age else None
-        
-        context = {
-            'subscription_type': 'premium',
-            'life_stage': life_stage,
-            'query_timestamp': datetime.now().isoformat()
+        data = _json_body()
+    except orjson.JSONDecodeError:
+        return _prebuilt_response(_ERR_INVALID_JSON, 400)
+    query = data.get('query', '').strip()
+    email = data.get('email')
+    # Only a string can be normalized; null or other types fall through to the 403 below
+    email = email.strip().lower() if isinstance(email, str) else None
+    user_id = data.get('user_id')
+    
+    if not query:
+        return _prebuilt_response(_ERR_QUERY_REQUIRED, 400)
+    
+    # Check subscription status
+    if not email or not is_subscribed(email):
+        return _prebuilt_response(_ERR_SUBSCRIPTION_REQUIRED, 403)
+    
+    # Get user's constitutional data if available
+    user_constitution = None
+    user_age = None
+    
+    if user_id:
+        user_row = load_user_context(user_id)
+        if user_row:
+            user_age, user_constitution = user_row
+    
+    # Generate AI response using enhanced processor
+    current_season = get_current_season()
+    life_stage = get_life_stage(user_age)
+    
+    context = {
+        'subscription_type': 'premium',
+        'life_stage': life_stage,
+        'query_timestamp': get_query_timestamp()
+    }
+    
+    ai_response = generate_ai_response(
+        query=query,
+        user_constitution=user_constitution,
+        user_age=user_age,
+        current_season=current_season,
+        context=context
+    )
+    
+    return jsonify({
+        'success': True,
+        'response': ai_response,
+        'user_context': {
+            'constitution': user_constitution,
+            'age': user_age,
+            'season': current_season,
+            'life_stage': life_stage
         }
-        
-        ai_response = generate_ai_response(
-            query=query,
-            user_constitution=user_constitution,
-            user_age=user_age,
-            current_season=current_season,
-            context=context
-        )
-        
-        # Log the query for analytics
-        try:
-            # You could add query logging here
-            pass
-        except Exception as log_error:
-            print(f"Query logging error: {log_error}")
-        
-        return jsonify({
-            'success': True,
-            'response': ai_response,
-            'user_context': {
-                'constitution': user_constitution,
-                'age': user_age,
-                'season': current_season,
-                'life_stage': life_stage
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': 'Internal server error',
-            'message': str(e)
-        }), 500
+    })
 
 @ai_query_bp.route('/constitutional-analysis/<constitution>', methods=['GET'])
 def get_constitutional_analysis(constitution):
     """Get detailed constitutional analysis"""
-    try:
-        analysis = ayurveda_astrology_kb.get_constitutional_analysis(constitution)
-        
-        if "error" in analysis:
-            return jsonify({'success': False, 'error': analysis["error"]}), 404
-        
-        return jsonify({
-            'success': True,
-            'analysis': analysis
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': 'Internal server error',
-            'message': str(e)
-        }), 500
+    etag = _kb_etag('constitutional', constitution)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    
+    analysis = ayurveda_astrology_kb.get_constitutional_analysis(constitution)
+    
+    if "error" in analysis:
+        return jsonify({'success': False, 'error': analysis["error"]}), 404
+    
+    return _cacheable(jsonify({
+        'success': True,
+        'analysis': analysis
+    }), etag)
 
 @ai_query_bp.route('/planetary-guidance/<planet>', methods=['GET'])
 def get_planetary_guidance(planet):
     """Get Vedic astrology planetary guidance"""
-    try:
-        constitution = request.args.get('constitution')
-        guidance = ayurveda_astrology_kb.get_planetary_guidance(planet, constitution)
-        
-        if "error" in guidance:
-            return jsonify({'success': False, 'error': guidance["error"]}), 404
-        
-        return jsonify({
-            'success': True,
-            'guidance': guidance
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': 'Internal server error',
-            'message': str(e)
-        }), 500
+    constitution = request.args.get('constitution')
+    etag = _kb_etag('planetary', planet, constitution)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    
+    guidance = ayurveda_astrology_kb.get_planetary_guidance(planet, constitution)
+    
+    if "error" in guidance:
+        return jsonify({'success': False, 'error': guidance["error"]}), 404
+    
+    return _cacheable(jsonify({
+        'success': True,
+        'guidance': guidance
+    }), etag)
 
 @ai_query_bp.route('/seasonal-recommendations', methods=['GET'])
 def get_seasonal_recommendations():
     """Get seasonal health recommendations"""
-    try:
-        season = request.args.get('season', get_current_season())
-        constitution = request.args.get('constitution', 'general')
-        
-        recommendations = ayurveda_astrology_kb.get_seasonal_recommendations(season, constitution)
-        
-        if "error" in recommendations:
-            return jsonify({'success': False, 'error': recommendations["error"]}), 404
-        
-        return jsonify({
-            'success': True,
-            'recommendations': recommendations
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': 'Internal server error',
-            'message': str(e)
-        }), 500
+    season = request.args.get('season', get_current_season())
+    constitution = request.args.get('constitution', 'general')
+    etag = _kb_etag('seasonal', season, constitution)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    
+    recommendations = ayurveda_astrology_kb.get_seasonal_recommendations(season, constitution)
+    
+    if "error" in recommendations:
+        return jsonify({'success': False, 'error': recommendations["error"]}), 404
+    
+    return _cacheable(jsonify({
+        'success': True,
+        'recommendations': recommendations
+    }), etag)
 
 @ai_query_bp.route('/avatar-script', methods=['POST'])
 def get_avatar_script():
     """Generate avatar script for speaking responses"""
     try:
-        data = request.get_json()
-        response_text = data.get('response_text', '')
-        context = data.get('context', 'general')
-        
-        # Generate speaking script for avatar
-        script = {
-            "text": response_text,
-            "voice_settings": {
-                "stability": 0.75,
-                "similarity_boost": 0.85,
-                "style": 0.65,
-                "use_speaker_boost": True
-            },
-            "speaking_style": "professional_warm",
-            "pause_points": [],
-            "emphasis_words": ["constitution", "dosha", "Ayurveda", "healing", "balance"]
-        }
-        
-        # Add natural pause points
-        sentences = response_text.split('. ')
-        for i, sentence in enumerate(sentences):
-            if i < len(sentences) - 1:  # Don't add pause after last sentence
-                script["pause_points"].append(len('. '.join(sentences[:i+1])) + 2)
-        
-        return jsonify({
-            'success': True,
-            'script': script
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': 'Internal server error',
-            'message': str(e)
-        }), 500
+        data = _json_body()
+    except orjson.JSONDecodeError:
+        return _prebuilt_response(_ERR_INVALID_JSON, 400)
+    response_text = data.get('response_text', '')
+    context = data.get('context', 'general')
+    
+    # Add natural pause points after every sentence break, scanning for
+    # '. ' directly instead of splitting into intermediate substrings
+    pause_points = []
+    i = response_text.find('. ')
+    while i >= 0:
+        i += 2
+        pause_points.append(i)
+        i = response_text.find('. ', i)
+    
+    # Generate speaking script for avatar
+    script = {
+        "text": response_text,
+        "voice_settings": _AVATAR_VOICE_SETTINGS,
+        "speaking_style": "professional_warm",
+        "pause_points": pause_points,
+        "emphasis_words": _AVATAR_EMPHASIS_WORDS
+    }
+    
+    return jsonify({
+        'success': True,
+        'script': script
+    })
 
 @ai_query_bp.route('/subscription-status/<email>', methods=['GET'])
 def check_subscription_status(email):
     """Check subscription status for email"""
-    try:
-        subscription = NewsletterSubscription.query.filter_by(email=email, is_active=True).first()
-        
-        return jsonify({
-            'success': True,
-            'subscribed': subscription is not None,
-            'subscription_date': subscription.created_at.isoformat() if subscription else None
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': 'Internal server error',
-            'message': str(e)
-        }), 500
+    subscribed, subscription_date = get_subscription(email.strip().lower())
+    
+    return jsonify({
+        'success': True,
+        'subscribed': subscribed,
+        'subscription_date': subscription_date.isoformat() if subscription_date else None
+    })
 
 # Newsletter subscription endpoint
 @ai_query_bp.route('/newsletter/subscribe', methods=['POST'])
 def subscribe_newsletter():
     """Subscribe to newsletter for AI access"""
     try:
-        data = request.get_json()
-        email = data.get('email', '').strip().lower()
-        
-        if not email:
-            return jsonify({'success': False, 'error': 'Email is required'}), 400
-        
+        data = _json_body()
+    except orjson.JSONDecodeError:
+        return _prebuilt_response(_ERR_INVALID_JSON, 400)
+    email = data.get('email', '').strip().lower()
+    
+    if not email:
+        return _prebuilt_response(_ERR_EMAIL_REQUIRED, 400)
+    
+    try:
         # Check if already subscribed
         existing = NewsletterSubscription.query.filter_by(email=email).first()
         
@@ -314,6 +412,7 @@ def subscribe_newsletter():
                 existing.is_active = True
                 existing.updated_at = datetime.utcnow()
                 db.session.commit()
+                remember_subscription(email, existing.created_at)
                 
                 return jsonify({
                     'success': True,
@@ -330,6 +429,7 @@ def subscribe_newsletter():
         
         db.session.add(subscription)
         db.session.commit()
+        remember_subscription(email, subscription.created_at)
         
         return jsonify({
             'success': True,
@@ -1,11 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from src.models.assessment import db, Assessment, LibraryContent, NewsletterSubscription
 from src.models.user import User
 from src.ai.enhanced_query_processor import enhanced_query_processor
 from src.ai.ayurveda_astrology_kb import ayurveda_astrology_kb
-from datetime import datetime, timedelta
-import json
+from bisect import bisect_right
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+import hashlib
 import os
+import re
+import sys
+import time
+import orjson
 
 ai_query_bp = Blueprint('ai_query', __name__)
 
@@ -120,23 +127,195 @@ AYURVEDIC_KNOWLEDGE = {
     }
 }
 
+def _intern_tree(value):
+    """Intern every string in a nested structure and turn lists into tuples"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_intern_tree(item) for item in value)
+    if isinstance(value, dict):
+        return {sys.intern(key): _intern_tree(item) for key, item in value.items()}
+    return value
+
+# Repeated terms ("warm", "kapha", ...) share one string object across the tree.
+# Only the top level is a read-only view: its sections can't be swapped out,
+# but the dicts nested under them are still mutable and must not be modified,
+# or the payloads precomputed from them below go stale.
+AYURVEDIC_KNOWLEDGE = MappingProxyType(_intern_tree(AYURVEDIC_KNOWLEDGE))
+
+# Energetic principles listed alongside the doshas on /knowledge/constitutions
+_ADVANCED_TYPES = {
+    "ojas": {
+        "description": "Vital essence and immunity strength",
+        "signs_balanced": ["radiant health", "strong immunity", "peaceful mind"],
+        "signs_imbalanced": ["chronic fatigue", "poor immunity", "dull complexion"],
+        "recommendations": ["quality sleep", "fresh foods", "spiritual practice"]
+    },
+    "tejas": {
+        "description": "Inner fire and spiritual insight",
+        "signs_balanced": ["sharp mind", "clear vision", "good judgment"],
+        "signs_imbalanced": ["mental fog", "poor concentration", "dull perception"],
+        "recommendations": ["meditation", "study", "ghee consumption"]
+    },
+    "prana": {
+        "description": "Life energy and consciousness",
+        "signs_balanced": ["vibrant energy", "clear breathing", "present awareness"],
+        "signs_imbalanced": ["shallow breathing", "low energy", "disconnection"],
+        "recommendations": ["pranayama", "fresh air", "mindfulness"]
+    }
+}
+
+# The constitutions payload never changes at runtime, so serialize it once
+_CONSTITUTIONS_BODY = orjson.dumps({
+    'success': True,
+    'constitutions': {**AYURVEDIC_KNOWLEDGE["constitutions"], **_ADVANCED_TYPES},
+    'total_types': 13,
+    'categories': ['primary_doshas', 'dual_constitutions', 'tri_dosha', 'energetic_principles']
+})
+_CONSTITUTIONS_ETAG = hashlib.md5(_CONSTITUTIONS_BODY).hexdigest()
+
+def _seasonal_response(season):
+    """Serialize a season's guidance payload and tag it by its content"""
+    season_data = AYURVEDIC_KNOWLEDGE["seasons"].get(season, {})
+    body = orjson.dumps({
+        'success': True,
+        'current_season': season,
+        'guidance': season_data,
+        'general_advice': f"During {season}, {season_data.get('dominant_dosha', 'unknown')} dosha tends to increase."
+    })
+    return body, hashlib.md5(body).hexdigest()
+
+# Seasonal guidance only varies by season: season -> (body, etag)
+_SEASONAL_RESPONSES = {season: _seasonal_response(season) for season in ("spring", "summer", "fall", "winter")}
+_KNOWLEDGE_CACHE_CONTROL = 'public, max-age=3600'
+
+def _not_modified(etag):
+    """Return an empty 304 if the client already holds this ETag, else None"""
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = _KNOWLEDGE_CACHE_CONTROL
+        return response
+    return None
+
+def _cacheable(response, etag):
+    """Attach the ETag and cache headers to a successful knowledge response"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = _KNOWLEDGE_CACHE_CONTROL
+    return response
+
+# Input limits checked before any database or processor work
+_MAX_QUERY_LENGTH = 2000
+_EMAIL_RE = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s]+')
+
+# Short-lived cache of active-subscription lookups: email -> (expires_at, active)
+_SUBSCRIPTION_CACHE_TTL = 60
+_SUBSCRIPTION_CACHE_MAX_SIZE = 10000
+_subscription_cache = {}
+
+def _cached_subscription(email):
+    """Return the cached active flag for an email, or None if unknown or expired"""
+    entry = _subscription_cache.get(email)
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    return entry[1]
+
+def _remember_subscription(email, active):
+    """Store the active flag for an email for the cache TTL"""
+    if len(_subscription_cache) >= _SUBSCRIPTION_CACHE_MAX_SIZE:
+        _subscription_cache.clear()
+    _subscription_cache[email] = (time.monotonic() + _SUBSCRIPTION_CACHE_TTL, active)
+
+def _load_query_context(email, user_id=None):
+    """
+    Return (subscribed, constitution) for a query. The constitution comes from
+    the user's most recent assessment, matched by user_id when given and by
+    email otherwise. On a subscription cache miss both values are fetched in
+    a single round trip; an unsubscribed email never touches the assessments.
+    """
+    subscribed = _cached_subscription(email)
+    if subscribed is False:
+        return False, None
+    
+    owner = Assessment.user_id == user_id if user_id else Assessment.email == email
+    latest_constitution = (db.session.query(Assessment.constitution)
+                           .filter(owner)
+                           .order_by(Assessment.created_at.desc())
+                           .limit(1))
+    if subscribed:
+        return True, latest_constitution.scalar()
+    
+    active = (db.session.query(NewsletterSubscription.id)
+              .filter_by(email=email, is_active=True)
+              .exists())
+    subscribed, constitution = db.session.query(active, latest_constitution.scalar_subquery()).one()
+    _remember_subscription(email, subscribed)
+    return subscribed, (constitution if subscribed else None)
+
+# Season for each month, indexed by datetime.month (index 0 unused)
+_SEASONS = (None, "winter", "winter", "spring", "spring", "spring", "summer",
+            "summer", "summer", "fall", "fall", "fall", "winter")
+
 def get_current_season():
     """Determine current season based on date"""
-    month = datetime.now().month
-    if month in [3, 4, 5]:
-        return "spring"
-    elif month in [6, 7, 8]:
-        return "summer"
-    elif month in [9, 10, 11]:
-        return "fall"
-    else:
-        return "winter"
+    return _SEASONS[datetime.now().month]
+
+# (epoch second, ISO string) for the last UTC timestamp handed out
+_utc_timestamp = (0, None)
+
+def get_utc_timestamp():
+    """Current UTC time in ISO format at one-second resolution, formatted once per second"""
+    global _utc_timestamp
+    second = int(time.time())
+    if _utc_timestamp[0] != second:
+        _utc_timestamp = (second, datetime.fromtimestamp(second, timezone.utc).replace(tzinfo=None).isoformat())
+    return _utc_timestamp[1]
+
+@lru_cache(maxsize=1024)
+def _process_query(query, user_constitution, user_age, current_season):
+    """
+    Memoized enhanced processor call. The processor only reads the query,
+    constitution and age (plus the current season, which is part of the key
+    so cached answers roll over with it). The returned dict is shared between
+    requests and must not be mutated.
+    """
+    user_data = {
+        "constitution": user_constitution,
+        "age": user_age
+    }
+    return enhanced_query_processor.process_query(query, user_data)
+
+# Standard fields added to every enhanced processor response
+_STANDARD_RESPONSE_FIELDS = MappingProxyType({
+    "source": "Dr. Helen Thomas DC - Enhanced NanoSutracore System",
+    "clinical_authority": "Dr. Helen Thomas DC - 44 years clinical experience",
+    "warning": "This guidance is for educational purposes. Always consult your healthcare provider for medical advice.",
+    "system": "Enhanced Query Processor with Ayurvedic & Astrological Intelligence"
+})
+
+# Fixed part of the fallback response used when the enhanced processor fails
+_FALLBACK_TEMPLATE = MappingProxyType({
+    "source": "Healing Airwaves Clinical Experience - Fallback Mode",
+    "personalized": True,
+    "clinical_authority": "Dr. Helen Thomas DC - 44 years experience",
+    "recommendations": ("Take constitutional assessment", "Consider pulse diagnosis", "Follow seasonal guidelines"),
+    "herbs_supplements": ("Triphala", "Ashwagandha", "Turmeric"),
+    "lifestyle_tips": ("Maintain regular routine", "Eat according to constitution", "Practice daily meditation"),
+    "warning": "This guidance is for educational purposes. Always consult your healthcare provider for medical advice."
+})
+
+# Life stages (keys of AYURVEDIC_KNOWLEDGE["life_cycles"]) and the ages at
+# which each following stage begins
+_LIFE_STAGES = ("childhood", "adulthood", "elderly")
+_LIFE_STAGE_BOUNDS = (16, 60)
 
 def get_life_stage(age):
     """Determine life stage based on age"""
-    if age < 16:
-        return "childhood"
-    elif def generate_ai_response(query, user_constitution=None, user_age=None, current_season=None, symptoms=None, context=None):
+    if not age:
+        return None
+    return _LIFE_STAGES[bisect_right(_LIFE_STAGE_BOUNDS, age)]
+
+def generate_ai_response(query, user_constitution=None, user_age=None, current_season=None, symptoms=None, context=None):
     """
     Generate AI response using Enhanced Query Processor with comprehensive knowledge bases:
     - 13 Ayurvedic Constitutions: Complete body type analysis
@@ -145,48 +324,34 @@ def get_life_stage(age):
     - Clinical Protocols: Dr. Helen's 44 years of experience
     """
     
-    # Prepare user data for the enhanced processor
-    user_data = {
-        "constitution": user_constitution,
-        "age": user_age,
-        "symptoms": symptoms or [],
-        "context": context or {}
-    }
-    
     try:
-        # Use the enhanced query processor
-        response = enhanced_query_processor.process_query(query, user_data)
-        
-        # Ensure response has required fields
-        if not response.get("answer"):
-            response["answer"] = f"Thank you for your question about {query}. Let me provide guidance based on Ayurvedic principles and my clinical experience."
+        # Use the enhanced query processor, reusing results for repeated questions
+        response = _process_query(query, user_constitution, user_age, get_current_season())
         
-        # Add standard fields for compatibility
-        response.update({
-            "source": "Dr. Helen Thomas DC - Enhanced NanoSutracore System",
+        # Ensure the answer is present and add standard fields for compatibility,
+        # building the final response in a single pass
+        return {
+            **response,
+            "answer": response.get("answer") or f"Thank you for your question about {query}. Let me provide guidance based on Ayurvedic principles and my clinical experience.",
+            **_STANDARD_RESPONSE_FIELDS,
             "constitution_specific": user_constitution is not None,
-            "personalized": bool(user_constitution),
-            "clinical_authority": "Dr. Helen Thomas DC - 44 years clinical experience",
-            "warning": "This guidance is for educational purposes. Always consult your healthcare provider for medical advice.",
-            "system": "Enhanced Query Processor with Ayurvedic & Astrological Intelligence"
-        })
-        
-        return response
+            "personalized": bool(user_constitution)
+        }
         
     except Exception as e:
         # Fallback response if enhanced processor fails
         return {
             "answer": f"I understand your question about {query}. From my 44 years of clinical experience with Ayurveda, let me share some guidance. The key is always to understand your constitution and current imbalances.",
-            "source": "Healing Airwaves Clinical Experience - Fallback Mode",
             "constitution_specific": user_constitution is not None,
-            "personalized": True,
-            "clinical_authority": "Dr. Helen Thomas DC - 44 years experience",
-            "recommendations": ["Take constitutional assessment", "Consider pulse diagnosis", "Follow seasonal guidelines"],
-            "herbs_supplements": ["Triphala", "Ashwagandha", "Turmeric"],
-            "lifestyle_tips": ["Maintain regular routine", "Eat according to constitution", "Practice daily meditation"],
-            "warning": "This guidance is for educational purposes. Always consult your healthcare provider for medical advice.",
+            **_FALLBACK_TEMPLATE,
             "error": f"Enhanced processor temporarily unavailable: {str(e)}"
-        }quest.get_json()
+        }
+
+@ai_query_bp.route('/query', methods=['POST'], strict_slashes=False)
+def ask_ai():
+    """Handle AI query requests with subscription validation"""
+    try:
+        data = request.get_json()
         query = data.get('query', '').strip()
         email = data.get('email')
         user_id = data.get('user_id')
@@ -194,34 +359,24 @@ def get_life_stage(age):
         if not query:
             return jsonify({'success': False, 'error': 'Query is required'}), 400
         
-        # Check subscription status
-        subscription = None
-        if email:
-            subscription = NewsletterSubscription.query.filter_by(email=email, is_active=True).first()
+        if len(query) > _MAX_QUERY_LENGTH:
+            return jsonify({'success': False, 'error': f'Query must be at most {_MAX_QUERY_LENGTH} characters'}), 400
         
-        if not subscription:
+        if email is not None and not (isinstance(email, str) and _EMAIL_RE.fullmatch(email)):
+            return jsonify({'success': False, 'error': 'Invalid email address'}), 400
+        
+        # Check subscription status and fetch the latest constitution together
+        subscribed, user_constitution = _load_query_context(email, user_id) if email else (False, None)
+        
+        if not subscribed:
             return jsonify({
                 'success': False, 
                 'error': 'Subscription required',
                 'message': 'Subscribe to access personalized AI guidance from Dr. Helen Thomas DC'
             }), 403
         
-        # Get user's constitution if available
-        user_constitution = None
         user_age = None
         
-        if user_id or email:
-            # Find most recent assessment
-            assessment_query = Assessment.query
-            if user_id:
-                assessment_query = assessment_query.filter_by(user_id=user_id)
-            elif email:
-                assessment_query = assessment_query.filter_by(email=email)
-            
-            recent_assessment = assessment_query.order_by(Assessment.created_at.desc()).first()
-            if recent_assessment:
-                user_constitution = recent_assessment.constitution
-        
         # Generate AI response
         ai_response = generate_ai_response(
             query=query,
@@ -239,13 +394,13 @@ def get_life_stage(age):
             'response': ai_response,
             'constitution': user_constitution,
             'personalized': bool(user_constitution),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': get_utc_timestamp()
         })
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@ai_query_bp.route('/subscription/status', methods=['POST'])
+@ai_query_bp.route('/subscription/status', methods=['POST'], strict_slashes=False)
 def check_subscription():
     """Check subscription status"""
     try:
@@ -255,6 +410,9 @@ def check_subscription():
         if not email:
             return jsonify({'success': False, 'error': 'Email is required'}), 400
         
+        if not (isinstance(email, str) and _EMAIL_RE.fullmatch(email)):
+            return jsonify({'success': False, 'error': 'Invalid email address'}), 400
+        
         subscription = NewsletterSubscription.query.filter_by(email=email).first()
         
         if not subscription:
@@ -276,71 +434,49 @@ def check_subscription():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@ai_query_bp.route('/knowledge/constitutions', methods=['GET'])
+@ai_query_bp.route('/knowledge/constitutions', methods=['GET'], strict_slashes=False)
 def get_constitution_info():
     """Get detailed information about all 13 constitutions"""
-    try:
-        # Extend basic knowledge with the 13 constitution system
-        extended_constitutions = dict(AYURVEDIC_KNOWLEDGE["constitutions"])
-        
-        # Add combination constitutions
-        combinations = [
-            "vata-pitta", "vata-kapha", "pitta-kapha", "pitta-vata", 
-            "kapha-vata", "kapha-pitta", "tri-dosha"
-        ]
-        
-        # Add advanced energetic principles
-        advanced_types = {
-            "ojas": {
-                "description": "Vital essence and immunity strength",
-                "signs_balanced": ["radiant health", "strong immunity", "peaceful mind"],
-                "signs_imbalanced": ["chronic fatigue", "poor immunity", "dull complexion"],
-                "recommendations": ["quality sleep", "fresh foods", "spiritual practice"]
-            },
-            "tejas": {
-                "description": "Inner fire and spiritual insight",
-                "signs_balanced": ["sharp mind", "clear vision", "good judgment"],
-                "signs_imbalanced": ["mental fog", "poor concentration", "dull perception"],
-                "recommendations": ["meditation", "study", "ghee consumption"]
-            },
-            "prana": {
-                "description": "Life energy and consciousness",
-                "signs_balanced": ["vibrant energy", "clear breathing", "present awareness"],
-                "signs_imbalanced": ["shallow breathing", "low energy", "disconnection"],
-                "recommendations": ["pranayama", "fresh air", "mindfulness"]
-            }
-        }
-        
-        extended_constitutions.update(advanced_types)
-        
-        return jsonify({
-            'success': True,
-            'constitutions': extended_constitutions,
-            'total_types': 13,
-            'categories': ['primary_doshas', 'dual_constitutions', 'tri_dosha', 'energetic_principles']
-        })
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    not_modified = _not_modified(_CONSTITUTIONS_ETAG)
+    if not_modified:
+        return not_modified
+    
+    response = current_app.response_class(_CONSTITUTIONS_BODY, mimetype='application/json')
+    return _cacheable(response, _CONSTITUTIONS_ETAG)
 
-@ai_query_bp.route('/guidance/seasonal', methods=['GET'])
+@ai_query_bp.route('/guidance/seasonal', methods=['GET'], strict_slashes=False)
 def get_seasonal_guidance():
     """Get current seasonal guidance"""
-    try:
-        current_season = get_current_season()
-        season_data = AYURVEDIC_KNOWLEDGE["seasons"].get(current_season, {})
-        
-        return jsonify({
-            'success': True,
-            'current_season': current_season,
-            'guidance': season_data,
-            'general_advice': f"During {current_season}, {season_data.get('dominant_dosha', 'unknown')} dosha tends to increase."
-        })
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    body, etag = _SEASONAL_RESPONSES[get_current_season()]
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    
+    # A new response wraps the shared bytes since after_request hooks add headers
+    response = current_app.response_class(body, mimetype='application/json')
+    return _cacheable(response, etag)
 
-@ai_query_bp.route('/avatar/contextual-script', methods=['POST'])
+# Avatar script templates by context, formatted with the season and constitution
+_SCRIPT_TEMPLATES = {
+    'welcome': "Hello, I'm Dr. Helen Thomas, DC. Welcome to Your Healing Guide powered by NanoSutracore - my advanced AI system integrating Healing Airwaves and Ayurveda Wisdom from 44 years of clinical practice.",
+    
+    'assessment_intro': "I'm here to guide you through discovering your Ayurvedic constitution using NanoSutracore intelligence. This assessment draws from my Healing Airwaves methodology and traditional Ayurveda Wisdom to reveal your unique body-mind type among the 13 constitutional patterns.",
+    
+    'seasonal': "Right now we're in {season} season. NanoSutracore analyzes how this affects your dosha balance and provides personalized guidance from my integrated knowledge bases.",
+    
+    'constitution_result': "Based on your assessment processed through NanoSutracore, your constitution is {constitution}. This is your unique blueprint - my AI system now personalizes all guidance specifically for your type.",
+    
+    'subscription_invite': "To access NanoSutracore's full intelligence - combining Healing Airwaves, Ayurveda Wisdom, and my 44 years of clinical experience - join our healing community. Ask any question about symptoms, nutrition, lifestyle, or Vedic astrology.",
+    
+    'query_response': "NanoSutracore is processing your question through my integrated knowledge bases - Healing Airwaves methodology and traditional Ayurveda Wisdom - to provide personalized guidance based on your constitution, current season, and clinical protocols I've developed over four decades.",
+    
+    'nanosutracore_intro': "NanoSutracore is my advanced AI reasoning system that combines three powerful knowledge bases: Healing Airwaves with my specialized clinical protocols, Ayurveda Wisdom from classical texts, and 44 years of practical patient experience. This creates unprecedented personalized guidance."
+}
+
+# constitution_result script used before the user's constitution is known
+_CONSTITUTION_PENDING_SCRIPT = "Your constitution is your unique blueprint. NanoSutracore will personalize all guidance once we determine your type."
+
+@ai_query_bp.route('/avatar/contextual-script', methods=['POST'], strict_slashes=False)
 def get_contextual_avatar_script():
     """Get avatar script based on user context and query"""
     try:
@@ -349,23 +485,12 @@ def get_contextual_avatar_script():
         user_constitution = data.get('constitution')
         current_season = get_current_season()
         
-        scripts = {
-            'welcome': f"Hello, I'm Dr. Helen Thomas, DC. Welcome to Your Healing Guide powered by NanoSutracore - my advanced AI system integrating Healing Airwaves and Ayurveda Wisdom from 44 years of clinical practice.",
-            
-            'assessment_intro': "I'm here to guide you through discovering your Ayurvedic constitution using NanoSutracore intelligence. This assessment draws from my Healing Airwaves methodology and traditional Ayurveda Wisdom to reveal your unique body-mind type among the 13 constitutional patterns.",
-            
-            'seasonal': f"Right now we're in {current_season} season. NanoSutracore analyzes how this affects your dosha balance and provides personalized guidance from my integrated knowledge bases.",
-            
-            'constitution_result': f"Based on your assessment processed through NanoSutracore, your constitution is {user_constitution}. This is your unique blueprint - my AI system now personalizes all guidance specifically for your type." if user_constitution else "Your constitution is your unique blueprint. NanoSutracore will personalize all guidance once we determine your type.",
-            
-            'subscription_invite': "To access NanoSutracore's full intelligence - combining Healing Airwaves, Ayurveda Wisdom, and my 44 years of clinical experience - join our healing community. Ask any question about symptoms, nutrition, lifestyle, or Vedic astrology.",
-            
-            'query_response': "NanoSutracore is processing your question through my integrated knowledge bases - Healing Airwaves methodology and traditional Ayurveda Wisdom - to provide personalized guidance based on your constitution, current season, and clinical protocols I've developed over four decades.",
-            
-            'nanosutracore_intro': "NanoSutracore is my advanced AI reasoning system that combines three powerful knowledge bases: Healing Airwaves with my specialized clinical protocols, Ayurveda Wisdom from classical texts, and 44 years of practical patient experience. This creates unprecedented personalized guidance."
-        }
-        
-        script = scripts.get(context, scripts['welcome'])
+        if context == 'constitution_result' and not user_constitution:
+            script = _CONSTITUTION_PENDING_SCRIPT
+        else:
+            # Only the selected template is formatted
+            template = _SCRIPT_TEMPLATES.get(context, _SCRIPT_TEMPLATES['welcome'])
+            script = template.format_map({'season': current_season, 'constitution': user_constitution})
         
         return jsonify({
             'success': True,
@@ -1,7 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, g, request, jsonify, stream_with_context
+from sqlalchemy.exc import IntegrityError
 from src.models.assessment import db, Assessment, LibraryContent, NewsletterSubscription
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+import hashlib
 import json
+import orjson
 
 assessment_bp = Blueprint('assessment', __name__)
 
@@ -109,36 +114,41 @@ CONSTITUTION_QUESTIONS = [
     }
 ]
 
+# (question_id, option_index) -> (vata, pitta, kapha) points for every answer option
+_OPTION_SCORES = {
+    (question['id'], index): (option.get('vata', 0), option.get('pitta', 0), option.get('kapha', 0))
+    for question in CONSTITUTION_QUESTIONS
+    for index, option in enumerate(question['options'])
+}
+
 def calculate_constitution(answers):
     """Calculate constitution based on answers"""
-    scores = {"vata": 0, "pitta": 0, "kapha": 0}
+    vata = pitta = kapha = 0
     
     for answer in answers:
-        question_id = answer.get('question_id')
-        option_index = answer.get('option_index')
-        
-        # Find the question
-        question = next((q for q in CONSTITUTION_QUESTIONS if q['id'] == question_id), None)
-        if question and 0 <= option_index < len(question['options']):
-            option = question['options'][option_index]
-            scores['vata'] += option.get('vata', 0)
-            scores['pitta'] += option.get('pitta', 0)
-            scores['kapha'] += option.get('kapha', 0)
+        points = _OPTION_SCORES.get((answer.get('question_id'), answer.get('option_index')))
+        if points:
+            vata += points[0]
+            pitta += points[1]
+            kapha += points[2]
     
-    # Determine primary constitution
-    primary = max(scores, key=scores.get)
+    scores = {"vata": vata, "pitta": pitta, "kapha": kapha}
     
-    # Check for dual constitution (if two doshas are close)
-    sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-    secondary = None
+    # Determine primary and runner-up doshas; ties go to the earlier of
+    # vata, pitta, kapha
+    if vata >= pitta and vata >= kapha:
+        primary, primary_score = 'vata', vata
+        runner_up, secondary_score = ('pitta', pitta) if pitta >= kapha else ('kapha', kapha)
+    elif pitta >= kapha:
+        primary, primary_score = 'pitta', pitta
+        runner_up, secondary_score = ('vata', vata) if vata >= kapha else ('kapha', kapha)
+    else:
+        primary, primary_score = 'kapha', kapha
+        runner_up, secondary_score = ('vata', vata) if vata >= pitta else ('pitta', pitta)
     
-    if len(sorted_scores) > 1:
-        primary_score = sorted_scores[0][1]
-        secondary_score = sorted_scores[1][1]
-        
-        # If secondary is within 20% of primary, it's a dual constitution
-        if secondary_score >= primary_score * 0.8:
-            secondary = sorted_scores[1][0]
+    # If secondary is within 20% of primary, it's a dual constitution. Compared
+    # in integers so the 80% boundary is exact; a runner-up with no points never counts.
+    secondary = runner_up if secondary_score > 0 and secondary_score * 5 >= primary_score * 4 else None
     
     return {
         'primary': primary,
@@ -147,114 +157,154 @@ def calculate_constitution(answers):
         'constitution': f"{primary}-{secondary}" if secondary else primary
     }
 
-def generate_recommendations(constitution_result):
-    """Generate personalized recommendations based on constitution"""
-    primary = constitution_result['primary']
-    secondary = constitution_result['secondary']
-    
-    recommendations = {
-        'diet': [],
-        'lifestyle': [],
-        'herbs': [],
-        'practices': []
-    }
-    
-    # Vata recommendations
-    if primary == 'vata' or secondary == 'vata':
-        recommendations['diet'].extend([
+# Recommendations contributed by each dosha, per category
+_RECOMMENDATIONS = {
+    'vata': {
+        'diet': (
             "Warm, cooked foods",
             "Sweet, sour, and salty tastes",
             "Regular meal times",
             "Avoid cold, dry, raw foods"
-        ])
-        recommendations['lifestyle'].extend([
+        ),
+        'lifestyle': (
             "Regular daily routine",
             "Adequate rest and sleep",
             "Gentle, grounding exercises",
             "Oil massage (abhyanga)"
-        ])
-        recommendations['herbs'].extend([
+        ),
+        'herbs': (
             "Ashwagandha for stress",
             "Triphala for digestion",
             "Brahmi for mental clarity"
-        ])
-        recommendations['practices'].extend([
+        ),
+        'practices': (
             "Meditation and pranayama",
             "Warm oil treatments",
             "Gentle yoga"
-        ])
-    
-    # Pitta recommendations
-    if primary == 'pitta' or secondary == 'pitta':
-        recommendations['diet'].extend([
+        )
+    },
+    'pitta': {
+        'diet': (
             "Cool, fresh foods",
             "Sweet, bitter, and astringent tastes",
             "Avoid spicy, oily, acidic foods",
             "Eat at regular times"
-        ])
-        recommendations['lifestyle'].extend([
+        ),
+        'lifestyle': (
             "Avoid overheating",
             "Moderate exercise",
             "Cool environments",
             "Avoid excessive competition"
-        ])
-        recommendations['herbs'].extend([
+        ),
+        'herbs': (
             "Aloe vera for cooling",
             "Neem for purification",
             "Coriander for digestion"
-        ])
-        recommendations['practices'].extend([
+        ),
+        'practices': (
             "Cooling pranayama",
             "Moon gazing",
             "Swimming or water activities"
-        ])
-    
-    # Kapha recommendations
-    if primary == 'kapha' or secondary == 'kapha':
-        recommendations['diet'].extend([
+        )
+    },
+    'kapha': {
+        'diet': (
             "Light, warm, spicy foods",
             "Pungent, bitter, and astringent tastes",
             "Avoid heavy, oily, sweet foods",
             "Eat lighter meals"
-        ])
-        recommendations['lifestyle'].extend([
+        ),
+        'lifestyle': (
             "Regular vigorous exercise",
             "Stay active and stimulated",
             "Avoid excessive sleep",
             "Dry brushing"
-        ])
-        recommendations['herbs'].extend([
+        ),
+        'herbs': (
             "Ginger for digestion",
             "Turmeric for inflammation",
             "Trikatu for metabolism"
-        ])
-        recommendations['practices'].extend([
+        ),
+        'practices': (
             "Energizing pranayama",
             "Dynamic yoga",
             "Early morning activities"
-        ])
+        )
+    }
+}
+
+@lru_cache(maxsize=16)
+def _recommendations_for(primary, secondary):
+    """
+    Recommendations for a (primary, secondary) pair. There are only a handful
+    of pairs, so each result is built once and shared; values are tuples and
+    the dict must not be mutated by callers.
+    """
+    # Each matching dosha contributes once, always in vata, pitta, kapha order
+    doshas = [_RECOMMENDATIONS[dosha] for dosha in _RECOMMENDATIONS if dosha == primary or dosha == secondary]
     
-    return recommendations
+    return {
+        category: tuple(chain.from_iterable(dosha[category] for dosha in doshas))
+        for category in ('diet', 'lifestyle', 'herbs', 'practices')
+    }
+
+def generate_recommendations(constitution_result):
+    """Generate personalized recommendations based on constitution"""
+    return _recommendations_for(constitution_result['primary'], constitution_result['secondary'])
+
+def _valid_answers(answers):
+    """Check the answer payload shape once before scoring and storing it"""
+    return isinstance(answers, list) and all(
+        isinstance(answer, dict)
+        and type(answer.get('question_id')) is int
+        and type(answer.get('option_index')) is int
+        for answer in answers
+    )
+
+def _error(message, status):
+    """Standard error envelope used by every endpoint in this blueprint"""
+    return jsonify({'success': False, 'error': message}), status
+
+@assessment_bp.before_request
+def _parse_json_body():
+    """Parse POST bodies once with orjson so handlers can read g.json"""
+    if request.method == 'POST':
+        try:
+            g.json = orjson.loads(request.get_data(cache=False) or b'{}')
+        except orjson.JSONDecodeError:
+            return _error('Invalid JSON body', 400)
+
+# The question set is fixed, so serialize it once and tag it for conditional GETs
+_QUESTIONS_BODY = orjson.dumps({
+    'success': True,
+    'questions': CONSTITUTION_QUESTIONS
+})
+_QUESTIONS_ETAG = hashlib.md5(_QUESTIONS_BODY).hexdigest()
 
 @assessment_bp.route('/questions', methods=['GET'])
 def get_questions():
     """Get all assessment questions"""
-    return jsonify({
-        'success': True,
-        'questions': CONSTITUTION_QUESTIONS
-    })
+    if request.if_none_match.contains(_QUESTIONS_ETAG):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(_QUESTIONS_BODY, mimetype='application/json')
+    response.set_etag(_QUESTIONS_ETAG)
+    return response
 
 @assessment_bp.route('/submit', methods=['POST'])
 def submit_assessment():
     """Submit assessment answers and get constitution result"""
     try:
-        data = request.get_json()
+        data = g.json
         answers = data.get('answers', [])
         email = data.get('email')
         user_id = data.get('user_id')
         
         if not answers:
-            return jsonify({'success': False, 'error': 'No answers provided'}), 400
+            return _error('No answers provided', 400)
+        
+        if not _valid_answers(answers):
+            return _error('Each answer needs integer question_id and option_index', 400)
         
         # Calculate constitution
         constitution_result = calculate_constitution(answers)
@@ -286,19 +336,46 @@ def submit_assessment():
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return _error(str(e), 500)
 
 @assessment_bp.route('/<int:assessment_id>', methods=['GET'])
 def get_assessment(assessment_id):
     """Get assessment results by ID"""
     try:
-        assessment = Assessment.query.get_or_404(assessment_id)
-        return jsonify({
-            'success': True,
-            'assessment': assessment.to_dict()
-        })
+        assessment = db.session.get(Assessment, assessment_id)
+        if assessment is None:
+            return _error('Assessment not found', 404)
+
+        # Stored assessments never change; created_at keeps a reused ID from matching an old tag
+        created = assessment.created_at.timestamp() if assessment.created_at else 0
+        etag = f"assessment-{assessment.id}-{created:.6f}"
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = jsonify({
+                'success': True,
+                'assessment': assessment.to_dict()
+            })
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return _error(str(e), 500)
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+# Default and maximum number of library items returned per page
+LIBRARY_PAGE_SIZE = 50
+LIBRARY_MAX_PAGE_SIZE = 200
+
+def _stream_library(rows, limit, offset):
+    """Yield the library page as JSON one item at a time, fetching rows in batches"""
+    dumps = current_app.json.dumps
+    yield b'{"success":true,"content":['
+    for index, item in enumerate(rows):
+        if index:
+            yield b','
+        yield dumps(item.to_dict()).encode()
+    yield f'],"limit":{limit},"offset":{offset}}}'.encode()
 
 @assessment_bp.route('/library', methods=['GET'])
 def get_library():
@@ -306,6 +383,8 @@ def get_library():
     try:
         category = request.args.get('category')
         search = request.args.get('search')
+        limit = min(max(request.args.get('limit', LIBRARY_PAGE_SIZE, type=int), 1), LIBRARY_MAX_PAGE_SIZE)
+        offset = max(request.args.get('offset', 0, type=int), 0)
         
         query = LibraryContent.query.filter_by(is_published=True)
         
@@ -313,38 +392,43 @@ def get_library():
             query = query.filter_by(category=category)
         
         if search:
-            query = query.filter(LibraryContent.title.contains(search))
+            # ILIKE (escaped) rather than LIKE so a pg_trgm GIN index on title can serve it
+            query = query.filter(LibraryContent.title.icontains(search, autoescape=True))
         
-        content = query.all()
+        # Iterating executes the query here, so database errors still get a JSON 500
+        rows = iter(query.order_by(LibraryContent.id).limit(limit).offset(offset).yield_per(100))
         
-        return jsonify({
-            'success': True,
-            'content': [item.to_dict() for item in content]
-        })
+        return current_app.response_class(
+            stream_with_context(_stream_library(rows, limit, offset)),
+            mimetype='application/json'
+        )
         
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return _error(str(e), 500)
 
 @assessment_bp.route('/newsletter/subscribe', methods=['POST'])
 def subscribe_newsletter():
     """Subscribe to newsletter"""
     try:
-        data = request.get_json()
+        data = g.json
         email = data.get('email')
         name = data.get('name')
         
         if not email:
-            return jsonify({'success': False, 'error': 'Email is required'}), 400
+            return _error('Email is required', 400)
         
-        # Check if already subscribed
-        existing = NewsletterSubscription.query.filter_by(email=email).first()
+        # Check if already subscribed, fetching only the columns needed to decide
+        existing = (db.session.query(NewsletterSubscription.id, NewsletterSubscription.is_active)
+                    .filter_by(email=email)
+                    .first())
         if existing:
             if existing.is_active:
-                return jsonify({'success': False, 'error': 'Already subscribed'}), 400
+                return _error('Already subscribed', 400)
             else:
-                # Reactivate subscription
-                existing.is_active = True
-                existing.unsubscribed_at = None
+                # Reactivate subscription without loading the full row
+                (NewsletterSubscription.query
+                 .filter_by(id=existing.id)
+                 .update({'is_active': True, 'unsubscribed_at': None}, synchronize_session=False))
                 db.session.commit()
                 return jsonify({'success': True, 'message': 'Subscription reactivated'})
         
@@ -355,7 +439,17 @@ def subscribe_newsletter():
         )
         
         db.session.add(subscription)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            # Only a concurrent subscription of the same email is a duplicate; other
+            # constraint failures go to the 500 path
+            if (db.session.query(NewsletterSubscription.id)
+                    .filter_by(email=email)
+                    .first()) is None:
+                raise
+            return _error('Already subscribed', 400)
         
         return jsonify({
             'success': True,
@@ -364,33 +458,39 @@ def subscribe_newsletter():
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return _error(str(e), 500)
+
+# Avatar scripts by type, and their responses serialized once at import
+_AVATAR_SCRIPTS = {
+    'welcome': "Hello and welcome. I'm Dr. Helen Thomas, DC. I've spent 44 years in the clinic, taught Ayurveda at college, and wrote two books — so you don't have to guess what works.",
+    'pulse': "The pulse shows me what's happening right now in your body. It reveals which areas are in balance or out of balance. It tells me if there's dryness, heat, inflammation, or congestion and stagnation.",
+    'consultation': "The first step is always simple: remoisturizing dryness, cooling heat and inflammation, or flushing mucus and stagnation. This is the beginning of real healing. Let's begin.",
+    'digestive': "If you feel burning, bloating, or reflux, your body is signaling that digestion is out of balance. What to do: sip cumin, coriander, and fennel tea.",
+    'sleep': "If you can't fall asleep, wake at night, or feel anxious in the evening, it may be your Vata running too fast. Try warm milk with nutmeg.",
+    'energy': "If you feel heavy, sluggish mornings, this may be Kapha energy that needs gentle stirring. Start with ginger-lemon tea and gentle movement."
+}
+_AVATAR_BODIES = {
+    script_type: orjson.dumps({'success': True, 'script': script, 'type': script_type})
+    for script_type, script in _AVATAR_SCRIPTS.items()
+}
 
 @assessment_bp.route('/avatar/speak', methods=['POST'])
 def avatar_speak():
     """Generate avatar speech content"""
     try:
-        data = request.get_json()
+        data = g.json
         script_type = data.get('type', 'welcome')
-        context = data.get('context', {})
-        
-        # Avatar scripts based on type
-        scripts = {
-            'welcome': "Hello and welcome. I'm Dr. Helen Thomas, DC. I've spent 44 years in the clinic, taught Ayurveda at college, and wrote two books — so you don't have to guess what works.",
-            'pulse': "The pulse shows me what's happening right now in your body. It reveals which areas are in balance or out of balance. It tells me if there's dryness, heat, inflammation, or congestion and stagnation.",
-            'consultation': "The first step is always simple: remoisturizing dryness, cooling heat and inflammation, or flushing mucus and stagnation. This is the beginning of real healing. Let's begin.",
-            'digestive': "If you feel burning, bloating, or reflux, your body is signaling that digestion is out of balance. What to do: sip cumin, coriander, and fennel tea.",
-            'sleep': "If you can't fall asleep, wake at night, or feel anxious in the evening, it may be your Vata running too fast. Try warm milk with nutmeg.",
-            'energy': "If you feel heavy, sluggish mornings, this may be Kapha energy that needs gentle stirring. Start with ginger-lemon tea and gentle movement."
-        }
         
-        script = scripts.get(script_type, scripts['welcome'])
+        body = _AVATAR_BODIES.get(script_type)
+        if body is not None:
+            return current_app.response_class(body, mimetype='application/json')
         
+        # Unknown types get the welcome script but still echo the requested type
         return jsonify({
             'success': True,
-            'script': script,
+            'script': _AVATAR_SCRIPTS['welcome'],
             'type': script_type
         })
         
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return _error(str(e), 500)
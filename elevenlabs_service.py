@@ -1,54 +1,202 @@
 import os
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor
+from urllib3.util.retry import Retry
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, BinaryIO, Callable, Iterator, List, Tuple, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bytes relayed per chunk while streaming synthesized audio
+AUDIO_CHUNK_SIZE = 16384
+
+# Voice settings used when a TTS call doesn't pass its own; shared, never modified
+_DEFAULT_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.8,
+    "style": 0.2,
+    "use_speaker_boost": True
+}
+
+# Only /tmp is writable on serverless hosts, so the cache lives there unless configured.
+# /tmp also holds voice-clone uploads, so the default cap there is kept small.
+_CONFIGURED_TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR')
+TTS_CACHE_DIR = _CONFIGURED_TTS_CACHE_DIR or os.path.join(tempfile.gettempdir(), 'tts_cache')
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES',
+                                    (500 if _CONFIGURED_TTS_CACHE_DIR else 64) * 1024 * 1024))
+
+class TTSCache:
+    """
+    On-disk cache of synthesized MP3s, content-addressed and evicted least
+    recently used first. The size cap covers the whole directory, so every
+    worker sharing it stays within one budget.
+    """
+    
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def key(text: str, voice_id: str, model_id: str, voice_settings: Dict[str, Any]) -> str:
+        """Hash of everything that determines the synthesized audio"""
+        payload = json.dumps([text, voice_id, model_id, voice_settings], sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+    
+    def get(self, key: str) -> Optional[Iterator[bytes]]:
+        """Stream a cached clip, or None on a miss"""
+        path = self._path(key)
+        try:
+            audio_file = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        # A clip's mtime is its last use, visible to every worker scanning the directory
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return self._iter_file(audio_file)
+    
+    def store(self, key: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Pass chunks through to the caller while writing them to the cache"""
+        fd, part_path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+        complete = False
+        try:
+            with os.fdopen(fd, 'wb') as part:
+                for chunk in chunks:
+                    part.write(chunk)
+                    yield chunk
+            # Readers only ever see whole files; concurrent writers of one key just replace each other
+            os.replace(part_path, self._path(key))
+            complete = True
+            self._evict(keep=key)
+        finally:
+            if not complete:
+                try:
+                    os.remove(part_path)
+                except OSError:
+                    pass
+    
+    def _evict(self, keep: str):
+        """Trim the directory to max_bytes, oldest mtime first, sparing the clip just written"""
+        # Re-scan rather than trust an in-process index: other workers add and remove clips too
+        with self._lock:
+            clips = []
+            total = 0
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.mp3') or entry.name == f"{keep}.mp3":
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:  # removed by another worker mid-scan
+                        continue
+                    clips.append((stat.st_mtime, entry.path, stat.st_size))
+                    total += stat.st_size
+            try:
+                total += os.path.getsize(self._path(keep))
+            except OSError:
+                pass
+            for _, path, size in sorted(clips):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+    
+    @staticmethod
+    def _iter_file(audio_file) -> Iterator[bytes]:
+        with audio_file:
+            while True:
+                chunk = audio_file.read(AUDIO_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
 class ElevenLabsService:
     """Service for integrating with ElevenLabs API for voice synthesis and cloning"""
     
-    def __init__(self):
+    def __init__(self, tts_cache: Optional[TTSCache] = None):
         self.api_key = os.getenv('ELEVENLABS_API_KEY', 'sk_5187fe66a968b74029c2a3fc057ad2b07def51b48fc60239')
         self.base_url = "https://api.elevenlabs.io/v1"
         self.headers = {
             "Accept": "application/json",
             "xi-api-key": self.api_key
         }
+        
+        # One pooled keep-alive session for every call instead of a new TLS handshake each time.
+        # Retry only covers idempotent methods, so TTS and clone POSTs are never sent twice.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # (connect, read) seconds, so a stalled ElevenLabs connection cannot wedge a worker
+        self.timeouts = (3.05, 30)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                              respect_retry_after_header=True)
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Scripted lines repeat constantly; serve them from disk instead of re-synthesizing
+        self.tts_cache = tts_cache if tts_cache is not None else TTSCache()
+    
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
     
     def get_voices(self) -> Dict[str, Any]:
         """Get all available voices from ElevenLabs"""
         try:
-            response = requests.get(
-                f"{self.base_url}/voices",
-                headers=self.headers
-            )
+            response = self.session.get(f"{self.base_url}/voices", timeout=self.timeouts)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching voices: {e}")
             return {"voices": []}
     
-    def create_voice_clone(self, name: str, description: str, audio_files: list) -> Optional[str]:
-        """Create a voice clone from audio files"""
+    def create_voice_clone(self, name: str, description: str, audio_files: List[Union[str, BinaryIO, bytes]],
+                           progress_callback: Optional[Callable[[MultipartEncoderMonitor], None]] = None) -> Optional[str]:
+        """Create a voice clone from audio files (paths, binary file objects or bytes)"""
+        opened = []
         try:
-            # Prepare files for upload
+            # Prepare files for upload; paths are opened here and read only as the body is sent
             files = []
             for i, audio_file in enumerate(audio_files):
+                if isinstance(audio_file, (str, os.PathLike)):
+                    audio_file = open(audio_file, 'rb')
+                    opened.append(audio_file)
                 files.append(('files', (f'sample_{i}.wav', audio_file, 'audio/wav')))
             
-            data = {
-                'name': name,
-                'description': description,
-                'labels': json.dumps({"accent": "american", "description": "Dr. Helen Thomas DC", "age": "middle_aged", "gender": "female", "use case": "healing_guide"})
-            }
+            fields = [
+                ('name', name),
+                ('description', description),
+                ('labels', json.dumps({"accent": "american", "description": "Dr. Helen Thomas DC", "age": "middle_aged", "gender": "female", "use case": "healing_guide"}))
+            ]
             
-            response = requests.post(
+            # Stream the multipart body instead of assembling every sample in memory first
+            body = MultipartEncoder(fields=fields + files)
+            if progress_callback is not None:
+                body = MultipartEncoderMonitor(body, progress_callback)
+            
+            response = self.session.post(
                 f"{self.base_url}/voices/add",
-                headers={"xi-api-key": self.api_key},
-                data=data,
-                files=files
+                data=body,
+                headers={"Content-Type": body.content_type},
+                timeout=self.timeouts
             )
             response.raise_for_status()
             result = response.json()
@@ -56,39 +204,72 @@ class ElevenLabsService:
         except requests.exceptions.RequestException as e:
             logger.error(f"Error creating voice clone: {e}")
             return None
+        finally:
+            for audio_file in opened:
+                audio_file.close()
     
-    def generate_speech(self, text: str, voice_id: str, model_id: str = "eleven_multilingual_v2") -> Optional[bytes]:
-        """Generate speech from text using specified voice"""
+    def generate_speech(self, text: str, voice_id: str, model_id: str = "eleven_multilingual_v2",
+                        voice_settings: Optional[Dict[str, Any]] = None) -> Optional[Iterator[bytes]]:
+        """Generate speech from text using specified voice, streamed as MP3 chunks"""
         try:
             data = {
                 "text": text,
                 "model_id": model_id,
-                "voice_settings": {
-                    "stability": 0.5,
-                    "similarity_boost": 0.8,
-                    "style": 0.2,
-                    "use_speaker_boost": True
-                }
+                "voice_settings": voice_settings or _DEFAULT_VOICE_SETTINGS
             }
             
-            response = requests.post(
+            cache_key = self.tts_cache.key(text, voice_id, model_id, data["voice_settings"])
+            cached = self.tts_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            response = self.session.post(
                 f"{self.base_url}/text-to-speech/{voice_id}",
                 json=data,
-                headers=self.headers
+                stream=True,
+                # Longer texts take longer to start synthesizing
+                timeout=(self.timeouts[0], max(self.timeouts[1], len(text) * 0.05))
             )
             response.raise_for_status()
-            return response.content
         except requests.exceptions.RequestException as e:
             logger.error(f"Error generating speech: {e}")
             return None
+        
+        # Errors above surface before any audio is sent; the body is relayed as it is synthesized
+        return self.tts_cache.store(cache_key, self._iter_audio(response))
+    
+    def generate_speech_bytes(self, text: str, voice_id: str, model_id: str = "eleven_multilingual_v2",
+                              voice_settings: Optional[Dict[str, Any]] = None) -> Optional[bytes]:
+        """Generate speech from text and return the whole MP3"""
+        chunks = self.generate_speech(text, voice_id, model_id, voice_settings)
+        if chunks is None:
+            return None
+        try:
+            return b"".join(chunks)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error generating speech: {e}")
+            return None
+    
+    def generate_speech_many(self, items: List[Tuple[str, str]], model_id: str = "eleven_multilingual_v2",
+                             max_workers: int = 8) -> List[Optional[bytes]]:
+        """Synthesize several (text, voice_id) segments concurrently, returning MP3s in input order"""
+        if not items:
+            return []
+        # Each call is mostly network wait, so threads overlap them; the session pool is sized for this
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(lambda item: self.generate_speech_bytes(item[0], item[1], model_id), items))
+    
+    @staticmethod
+    def _iter_audio(response: requests.Response) -> Iterator[bytes]:
+        try:
+            yield from response.iter_content(chunk_size=AUDIO_CHUNK_SIZE)
+        finally:
+            response.close()
     
     def get_voice_settings(self, voice_id: str) -> Dict[str, Any]:
         """Get voice settings for a specific voice"""
         try:
-            response = requests.get(
-                f"{self.base_url}/voices/{voice_id}/settings",
-                headers=self.headers
-            )
+            response = self.session.get(f"{self.base_url}/voices/{voice_id}/settings", timeout=self.timeouts)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -103,10 +284,10 @@ class ElevenLabsService:
                 "similarity_boost": similarity_boost
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/voices/{voice_id}/settings/edit",
                 json=data,
-                headers=self.headers
+                timeout=self.timeouts
             )
             response.raise_for_status()
             return True
@@ -117,10 +298,7 @@ class ElevenLabsService:
     def delete_voice(self, voice_id: str) -> bool:
         """Delete a custom voice"""
         try:
-            response = requests.delete(
-                f"{self.base_url}/voices/{voice_id}",
-                headers=self.headers
-            )
+            response = self.session.delete(f"{self.base_url}/voices/{voice_id}", timeout=self.timeouts)
             response.raise_for_status()
             return True
         except requests.exceptions.RequestException as e:
@@ -130,10 +308,7 @@ class ElevenLabsService:
     def get_user_info(self) -> Dict[str, Any]:
         """Get user subscription info and usage"""
         try:
-            response = requests.get(
-                f"{self.base_url}/user",
-                headers=self.headers
-            )
+            response = self.session.get(f"{self.base_url}/user", timeout=self.timeouts)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -5,103 +5,142 @@ Integrating NanoSutracore with comprehensive knowledge bases
 
 import re
 import json
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from datetime import datetime, timedelta
 from .ayurveda_astrology_kb import ayurveda_astrology_kb
 
+# Keyword vocabularies matched as plain substrings of the lowercased query, keyed by analysis field
+_KEYWORD_VOCABULARIES = (
+    ("symptoms", ("pain", "ache", "tired", "fatigue", "insomnia", "anxiety", "depression", "headache", "nausea", "bloating", "constipation", "diarrhea")),
+    ("body_parts", ("head", "heart", "stomach", "back", "joints", "skin", "eyes", "throat", "chest", "abdomen")),
+    ("emotions", ("anxious", "stressed", "angry", "sad", "depressed", "worried", "fearful", "irritated")),
+    ("constitution_mentions", ("vata", "pitta", "kapha"))
+)
+
+_PLANET_KEYWORDS = ("sun", "moon", "mars", "mercury", "jupiter", "venus", "saturn", "rahu", "ketu")
+
+# Season by calendar month (index 0 unused)
+_SEASONS = (None, "winter", "winter", "spring", "spring", "spring", "summer",
+            "summer", "summer", "fall", "fall", "fall", "winter")
+
+def _compile_patterns(patterns: Dict[str, Tuple[str, ...]]) -> MappingProxyType:
+    """Compile each query type's patterns once, at import"""
+    return MappingProxyType({query_type: tuple(re.compile(pattern) for pattern in type_patterns)
+                             for query_type, type_patterns in patterns.items()})
+
+# Query pattern recognition for different types of questions
+_QUERY_PATTERNS = _compile_patterns({
+    "constitutional": (
+        r"what.*constitution.*am.*i",
+        r"my.*body.*type",
+        r"dosha.*analysis",
+        r"vata.*pitta.*kapha",
+        r"ayurvedic.*type"
+    ),
+    "symptoms": (
+        r"i.*have.*symptoms?",
+        r"experiencing.*problems?",
+        r"feeling.*unwell",
+        r"health.*issues?",
+        r"pain.*in.*"
+    ),
+    "dietary": (
+        r"what.*should.*i.*eat",
+        r"food.*recommendations?",
+        r"diet.*for.*",
+        r"nutrition.*advice",
+        r"avoid.*eating"
+    ),
+    "lifestyle": (
+        r"lifestyle.*changes?",
+        r"daily.*routine",
+        r"exercise.*recommendations?",
+        r"sleep.*advice",
+        r"stress.*management"
+    ),
+    "seasonal": (
+        r"current.*season",
+        r"winter.*summer.*spring.*fall",
+        r"seasonal.*advice",
+        r"weather.*affecting",
+        r"time.*of.*year"
+    ),
+    "astrological": (
+        r"planetary.*influence",
+        r"vedic.*astrology",
+        r"birth.*chart",
+        r"planets?.*affecting",
+        r"astrological.*remedy"
+    ),
+    "herbs": (
+        r"herbs?.*for.*",
+        r"supplements?.*recommendations?",
+        r"natural.*remedies?",
+        r"ayurvedic.*medicine",
+        r"herbal.*treatment"
+    ),
+    "age_related": (
+        r"my.*age.*is",
+        r"i.*am.*years.*old",
+        r"life.*stage",
+        r"aging.*concerns?",
+        r"elderly.*care"
+    )
+})
+
+# Dr. Helen's clinical wisdom and treatment approaches
+_CLINICAL_WISDOM = MappingProxyType({
+    "diagnostic_approach": {
+        "pulse_reading": "First, I assess the pulse quality - is it moving like a snake (vata), frog (pitta), or swan (kapha)?",
+        "tongue_examination": "The tongue reveals much about digestion and dosha balance",
+        "constitutional_assessment": "Understanding your prakruti (birth constitution) vs vikruti (current imbalance)",
+        "lifestyle_analysis": "How your daily routine affects your doshic balance"
+    },
+    
+    "treatment_philosophy": {
+        "root_cause": "We treat the root cause, not just symptoms",
+        "individual_approach": "Each person is unique - no one-size-fits-all solutions",
+        "gradual_healing": "Healing happens in layers, be patient with the process",
+        "prevention": "Prevention is always better than cure"
+    },
+    
+    "common_patterns": {
+        "modern_lifestyle": "Most people today have vata imbalances from stress and irregular routines",
+        "digestive_fire": "Weak agni (digestive fire) is at the root of most diseases",
+        "seasonal_awareness": "Many health issues can be prevented by living in harmony with seasons",
+        "mind_body_connection": "Mental and emotional states directly affect physical health"
+    }
+})
+
+def _response_defaults() -> Dict:
+    """Fresh response skeleton every query starts from; handlers only supply the fields they own"""
+    return {
+        "answer": "",
+        "constitutional_guidance": {},
+        "astrological_insights": {},
+        "seasonal_recommendations": {},
+        "clinical_wisdom": "",
+        "herbs_and_supplements": [],
+        "lifestyle_modifications": [],
+        "dietary_guidance": [],
+        "follow_up_questions": [],
+        "confidence_level": "high",
+        "source": "Dr. Helen Thomas DC - 44 years clinical experience + NanoSutracore AI"
+    }
+
+_NO_FIELDS = MappingProxyType({})
+
 class EnhancedQueryProcessor:
     """Advanced query processor for Ayurvedic and astrological guidance"""
     
     def __init__(self):
         self.kb = ayurveda_astrology_kb
-        self.query_patterns = self._load_query_patterns()
-        self.clinical_wisdom = self._load_clinical_wisdom()
-    
-    def _load_query_patterns(self) -> Dict:
-        """Load query pattern recognition for different types of questions"""
-        return {
-            "constitutional": [
-                r"what.*constitution.*am.*i",
-                r"my.*body.*type",
-                r"dosha.*analysis",
-                r"vata.*pitta.*kapha",
-                r"ayurvedic.*type"
-            ],
-            "symptoms": [
-                r"i.*have.*symptoms?",
-                r"experiencing.*problems?",
-                r"feeling.*unwell",
-                r"health.*issues?",
-                r"pain.*in.*"
-            ],
-            "dietary": [
-                r"what.*should.*i.*eat",
-                r"food.*recommendations?",
-                r"diet.*for.*",
-                r"nutrition.*advice",
-                r"avoid.*eating"
-            ],
-            "lifestyle": [
-                r"lifestyle.*changes?",
-                r"daily.*routine",
-                r"exercise.*recommendations?",
-                r"sleep.*advice",
-                r"stress.*management"
-            ],
-            "seasonal": [
-                r"current.*season",
-                r"winter.*summer.*spring.*fall",
-                r"seasonal.*advice",
-                r"weather.*affecting",
-                r"time.*of.*year"
-            ],
-            "astrological": [
-                r"planetary.*influence",
-                r"vedic.*astrology",
-                r"birth.*chart",
-                r"planets?.*affecting",
-                r"astrological.*remedy"
-            ],
-            "herbs": [
-                r"herbs?.*for.*",
-                r"supplements?.*recommendations?",
-                r"natural.*remedies?",
-                r"ayurvedic.*medicine",
-                r"herbal.*treatment"
-            ],
-            "age_related": [
-                r"my.*age.*is",
-                r"i.*am.*years.*old",
-                r"life.*stage",
-                r"aging.*concerns?",
-                r"elderly.*care"
-            ]
-        }
-    
-    def _load_clinical_wisdom(self) -> Dict:
-        """Dr. Helen's clinical wisdom and treatment approaches"""
-        return {
-            "diagnostic_approach": {
-                "pulse_reading": "First, I assess the pulse quality - is it moving like a snake (vata), frog (pitta), or swan (kapha)?",
-                "tongue_examination": "The tongue reveals much about digestion and dosha balance",
-                "constitutional_assessment": "Understanding your prakruti (birth constitution) vs vikruti (current imbalance)",
-                "lifestyle_analysis": "How your daily routine affects your doshic balance"
-            },
-            
-            "treatment_philosophy": {
-                "root_cause": "We treat the root cause, not just symptoms",
-                "individual_approach": "Each person is unique - no one-size-fits-all solutions",
-                "gradual_healing": "Healing happens in layers, be patient with the process",
-                "prevention": "Prevention is always better than cure"
-            },
-            
-            "common_patterns": {
-                "modern_lifestyle": "Most people today have vata imbalances from stress and irregular routines",
-                "digestive_fire": "Weak agni (digestive fire) is at the root of most diseases",
-                "seasonal_awareness": "Many health issues can be prevented by living in harmony with seasons",
-                "mind_body_connection": "Mental and emotional states directly affect physical health"
-            }
-        }
+        self.query_patterns = _QUERY_PATTERNS
+        self.clinical_wisdom = _CLINICAL_WISDOM
+        # The KB memoizes plain lookups itself, but not ones carrying a symptom list
+        self._const_cache = lru_cache(maxsize=256)(self._constitutional_analysis)
     
     def process_query(self, query: str, user_data: Dict = None) -> Dict:
         """Process user query and provide comprehensive guidance"""
@@ -134,16 +173,13 @@ class EnhancedQueryProcessor:
         # Identify query types
         for query_type, patterns in self.query_patterns.items():
             for pattern in patterns:
-                if re.search(pattern, query_lower):
+                if pattern.search(query_lower):
                     analysis["query_types"].append(query_type)
                     break
         
         # Extract specific keywords
         analysis["keywords"] = self._extract_keywords(query_lower)
-        analysis["symptoms"] = self._extract_symptoms(query_lower)
-        analysis["body_parts"] = self._extract_body_parts(query_lower)
-        analysis["emotions"] = self._extract_emotions(query_lower)
-        analysis["constitution_mentions"] = self._extract_constitution_mentions(query_lower)
+        analysis.update(self._extract_all(query_lower))
         
         return analysis
     
@@ -160,42 +196,38 @@ class EnhancedQueryProcessor:
         
         return context
     
+    def _constitutional_analysis(self, constitution: str, symptoms: Tuple[str, ...]) -> Mapping:
+        """Constitutional analysis for a hashable symptom tuple, shared read-only between queries"""
+        return MappingProxyType(self.kb.get_constitutional_analysis(constitution, list(symptoms)))
+    
     def _generate_comprehensive_response(self, query: str, analysis: Dict, context: Dict) -> Dict:
         """Generate comprehensive response using all available knowledge"""
         
+        # Fetch the knowledge base entries once and share them across the handlers
+        constitution = context.get("constitution")
+        season = context.get("current_season")
+        const_data = (self._const_cache(constitution, tuple(analysis.get("symptoms", ())))
+                      if constitution else None)
+        seasonal_data = self.kb.get_seasonal_recommendations(season or "current", constitution or "general", copy=True)
+        
+        # Generate main answer based on query types; later handlers win on shared fields
+        query_types = analysis["query_types"]
         response = {
-            "answer": "",
-            "constitutional_guidance": {},
-            "astrological_insights": {},
-            "seasonal_recommendations": {},
-            "clinical_wisdom": "",
-            "herbs_and_supplements": [],
-            "lifestyle_modifications": [],
-            "dietary_guidance": [],
-            "follow_up_questions": [],
-            "confidence_level": "high",
-            "source": "Dr. Helen Thomas DC - 44 years clinical experience + NanoSutracore AI"
+            **_response_defaults(),
+            **(self._handle_constitutional_query(query, analysis, context, const_data)
+               if "constitutional" in query_types else _NO_FIELDS),
+            **(self._handle_symptoms_query(query, analysis, context)
+               if "symptoms" in query_types else _NO_FIELDS),
+            **(self._handle_dietary_query(query, analysis, context, const_data, seasonal_data)
+               if "dietary" in query_types else _NO_FIELDS),
+            **(self._handle_astrological_query(query, analysis, context)
+               if "astrological" in query_types else _NO_FIELDS),
+            **(self._handle_seasonal_query(query, analysis, context, seasonal_data)
+               if "seasonal" in query_types else _NO_FIELDS),
+            **(self._handle_herbs_query(query, analysis, context, const_data)
+               if "herbs" in query_types else _NO_FIELDS)
         }
         
-        # Generate main answer based on query types
-        if "constitutional" in analysis["query_types"]:
-            response.update(self._handle_constitutional_query(query, analysis, context))
-        
-        if "symptoms" in analysis["query_types"]:
-            response.update(self._handle_symptoms_query(query, analysis, context))
-        
-        if "dietary" in analysis["query_types"]:
-            response.update(self._handle_dietary_query(query, analysis, context))
-        
-        if "astrological" in analysis["query_types"]:
-            response.update(self._handle_astrological_query(query, analysis, context))
-        
-        if "seasonal" in analysis["query_types"]:
-            response.update(self._handle_seasonal_query(query, analysis, context))
-        
-        if "herbs" in analysis["query_types"]:
-            response.update(self._handle_herbs_query(query, analysis, context))
-        
         # Add clinical wisdom and personalization
         response["clinical_wisdom"] = self._add_clinical_wisdom(analysis, context)
         response["follow_up_questions"] = self._generate_follow_up_questions(analysis, context)
@@ -206,16 +238,15 @@ class EnhancedQueryProcessor:
         
         return response
     
-    def _handle_constitutional_query(self, query: str, analysis: Dict, context: Dict) -> Dict:
+    def _handle_constitutional_query(self, query: str, analysis: Dict, context: Dict, const_data: Optional[Dict]) -> Dict:
         """Handle constitution-related queries"""
         constitution = context.get("constitution")
         
         if constitution:
-            const_analysis = self.kb.get_constitutional_analysis(constitution, analysis.get("symptoms", []))
-            
             return {
                 "answer": f"Based on your {constitution} constitution, here's what I observe from my 44 years of clinical experience...",
-                "constitutional_guidance": const_analysis,
+                # The memoized view is shared between queries; hand the caller its own dict
+                "constitutional_guidance": dict(const_data),
                 "personalized": True
             }
         else:
@@ -244,7 +275,8 @@ class EnhancedQueryProcessor:
         
         return response_data
     
-    def _handle_dietary_query(self, query: str, analysis: Dict, context: Dict) -> Dict:
+    def _handle_dietary_query(self, query: str, analysis: Dict, context: Dict,
+                              const_data: Optional[Dict], seasonal_data: Dict) -> Dict:
         """Handle dietary and nutrition queries"""
         constitution = context.get("constitution")
         season = context.get("current_season")
@@ -252,11 +284,9 @@ class EnhancedQueryProcessor:
         dietary_guidance = []
         
         if constitution:
-            const_data = self.kb.get_constitutional_analysis(constitution)
             dietary_guidance.extend(const_data.get("balancing_foods", []))
         
         if season:
-            seasonal_data = self.kb.get_seasonal_recommendations(season, constitution or "general")
             dietary_guidance.extend(seasonal_data.get("foods_to_favor", []))
         
         return {
@@ -275,7 +305,9 @@ class EnhancedQueryProcessor:
         astrological_insights = {}
         
         for planet in planets:
-            planet_guidance = self.kb.get_planetary_guidance(planet, constitution)
+            planet_guidance = self.kb.get_planetary_guidance(planet, constitution, copy=True)
+            if "constitutional_specific" in planet_guidance:
+                planet_guidance["constitutional_specific"] = dict(planet_guidance["constitutional_specific"])
             astrological_insights[planet] = planet_guidance
         
         return {
@@ -284,26 +316,24 @@ class EnhancedQueryProcessor:
             "remedial_measures": self._compile_remedial_measures(planets)
         }
     
-    def _handle_seasonal_query(self, query: str, analysis: Dict, context: Dict) -> Dict:
+    def _handle_seasonal_query(self, query: str, analysis: Dict, context: Dict, seasonal_data: Dict) -> Dict:
         """Handle seasonal health queries"""
         season = context.get("current_season")
         constitution = context.get("constitution")
         
         if season and constitution:
-            seasonal_recs = self.kb.get_seasonal_recommendations(season, constitution)
-            
             return {
                 "answer": f"For the {season} season and your {constitution} constitution, here's my guidance...",
-                "seasonal_recommendations": seasonal_recs,
-                "seasonal_herbs": seasonal_recs.get("seasonal_herbs", [])
+                "seasonal_recommendations": seasonal_data,
+                "seasonal_herbs": seasonal_data.get("seasonal_herbs", [])
             }
         
         return {
             "answer": "Seasonal health depends on your constitution. Let me provide general seasonal guidance...",
-            "seasonal_recommendations": self.kb.get_seasonal_recommendations(season or "current", "general")
+            "seasonal_recommendations": seasonal_data
         }
     
-    def _handle_herbs_query(self, query: str, analysis: Dict, context: Dict) -> Dict:
+    def _handle_herbs_query(self, query: str, analysis: Dict, context: Dict, const_data: Optional[Dict]) -> Dict:
         """Handle herbal medicine queries"""
         constitution = context.get("constitution")
         symptoms = analysis.get("symptoms", [])
@@ -311,7 +341,6 @@ class EnhancedQueryProcessor:
         herb_recommendations = []
         
         if constitution:
-            const_data = self.kb.get_constitutional_analysis(constitution)
             herb_recommendations.extend(const_data.get("recommended_herbs", []))
         
         # Add symptom-specific herbs
@@ -320,7 +349,7 @@ class EnhancedQueryProcessor:
         
         return {
             "answer": "Based on your constitution and symptoms, here are my herbal recommendations...",
-            "herbs_and_supplements": list(set(herb_recommendations)),  # Remove duplicates
+            "herbs_and_supplements": list(dict.fromkeys(herb_recommendations)),  # Remove duplicates, keeping order
             "preparation_methods": self._get_herb_preparation_methods(herb_recommendations),
             "precautions": "Always consult with a qualified practitioner before starting herbal treatments."
         }
@@ -368,62 +397,19 @@ class EnhancedQueryProcessor:
         # Implementation for keyword extraction
         return []
     
-    def _extract_symptoms(self, query: str) -> List[str]:
-        """Extract symptoms mentioned in query"""
-        symptom_keywords = ["pain", "ache", "tired", "fatigue", "insomnia", "anxiety", "depression", "headache", "nausea", "bloating", "constipation", "diarrhea"]
-        found_symptoms = []
-        for symptom in symptom_keywords:
-            if symptom in query:
-                found_symptoms.append(symptom)
-        return found_symptoms
-    
-    def _extract_body_parts(self, query: str) -> List[str]:
-        """Extract body parts mentioned in query"""
-        body_parts = ["head", "heart", "stomach", "back", "joints", "skin", "eyes", "throat", "chest", "abdomen"]
-        found_parts = []
-        for part in body_parts:
-            if part in query:
-                found_parts.append(part)
-        return found_parts
-    
-    def _extract_emotions(self, query: str) -> List[str]:
-        """Extract emotional states mentioned in query"""
-        emotions = ["anxious", "stressed", "angry", "sad", "depressed", "worried", "fearful", "irritated"]
-        found_emotions = []
-        for emotion in emotions:
-            if emotion in query:
-                found_emotions.append(emotion)
-        return found_emotions
-    
-    def _extract_constitution_mentions(self, query: str) -> List[str]:
-        """Extract constitution types mentioned in query"""
-        constitutions = ["vata", "pitta", "kapha"]
-        found_constitutions = []
-        for const in constitutions:
-            if const in query:
-                found_constitutions.append(const)
-        return found_constitutions
+    def _extract_all(self, query: str) -> Dict[str, List[str]]:
+        """Extract symptoms, body parts, emotions and constitutions mentioned in query in one pass"""
+        return {category: [keyword for keyword in keywords if keyword in query]
+                for category, keywords in _KEYWORD_VOCABULARIES}
     
     def _extract_planetary_references(self, query: str) -> List[str]:
         """Extract planetary references from query"""
-        planets = ["sun", "moon", "mars", "mercury", "jupiter", "venus", "saturn", "rahu", "ketu"]
-        found_planets = []
-        for planet in planets:
-            if planet in query.lower():
-                found_planets.append(planet)
-        return found_planets
+        query_lower = query.lower()
+        return [planet for planet in _PLANET_KEYWORDS if planet in query_lower]
     
     def _get_current_season(self) -> str:
         """Determine current season"""
-        month = datetime.now().month
-        if month in [3, 4, 5]:
-            return "spring"
-        elif month in [6, 7, 8]:
-            return "summer"
-        elif month in [9, 10, 11]:
-            return "fall"
-        else:
-            return "winter"
+        return _SEASONS[datetime.now().month]
     
     def _determine_life_stage(self, age: Optional[int]) -> str:
         """Determine life stage based on age"""
@@ -476,7 +462,7 @@ class EnhancedQueryProcessor:
         for planet in planets:
             planet_data = self.kb.get_planetary_guidance(planet)
             measures.extend(planet_data.get("remedial_measures", []))
-        return list(set(measures))  # Remove duplicates
+        return list(dict.fromkeys(measures))  # Remove duplicates, keeping order
 
 # Initialize the enhanced query processor
 enhanced_query_processor = EnhancedQueryProcessor()
@@ -1,24 +1,76 @@
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, jsonify, request, send_from_directory
+from werkzeug.exceptions import NotFound
+import logging
 import os
-from datetime import datetime
+from datetime import date, datetime
+
+try:
+    import redis
+except ImportError:  # download counting is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
 
 lead_magnet_bp = Blueprint('lead_magnet', __name__)
 
+STATIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static'))
+LEAD_MAGNET_PDF = 'The_13_Ayurvedic_Body_Types.pdf'
+LEAD_MAGNET_MAX_AGE = 86400
+
+# Download counters live in Redis when REDIS_URL is configured; INCR is atomic, so
+# concurrent downloads never contend on a database row
+REDIS_URL = os.getenv('REDIS_URL')
+_counters = (redis.Redis(connection_pool=redis.BlockingConnectionPool.from_url(REDIS_URL, max_connections=16))
+             if redis is not None and REDIS_URL else None)
+
+_TOTAL_KEY = 'lm:dl:total'
+_SOURCES_KEY = 'lm:dl:sources'  # sorted set: source -> downloads
+
+# ?src= values tracked individually; anything else is counted as 'other' so
+# clients cannot grow the sources set
+DOWNLOAD_SOURCES = frozenset({'welcome_page', 'newsletter', 'assessment', 'unknown'})
+_MAX_SOURCE_LENGTH = 32
+
+def _download_source(raw):
+    """Map the ?src= query parameter onto a known source"""
+    if len(raw) <= _MAX_SOURCE_LENGTH and raw in DOWNLOAD_SOURCES:
+        return raw
+    return 'other'
+
+def _count_download(source):
+    """Record one download in a single round trip"""
+    today = date.today()
+    try:
+        (_counters.pipeline(transaction=False)
+            .incr(_TOTAL_KEY)
+            .incr(f'lm:dl:month:{today:%Y-%m}')
+            .zincrby(_SOURCES_KEY, 1, source)
+            .execute())
+    except redis.RedisError as e:
+        # Never fail a download because the counters are unavailable
+        logger.warning(f"Could not record lead magnet download: {e}")
+
 @lead_magnet_bp.route('/api/lead-magnet/download', methods=['GET'])
 def download_13_body_types():
     """Download the 13 Ayurvedic Body Types PDF"""
     try:
-        pdf_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'The_13_Ayurvedic_Body_Types.pdf')
-        
-        if not os.path.exists(pdf_path):
-            return jsonify({'error': 'PDF not found'}), 404
-            
-        return send_file(
-            pdf_path,
+        # Conditional GET: repeat downloads revalidate via ETag/Last-Modified and get a 304
+        response = send_from_directory(
+            STATIC_DIR,
+            LEAD_MAGNET_PDF,
             as_attachment=True,
-            download_name='The_13_Ayurvedic_Body_Types.pdf',
-            mimetype='application/pdf'
+            download_name=LEAD_MAGNET_PDF,
+            mimetype='application/pdf',
+            max_age=LEAD_MAGNET_MAX_AGE,
+            conditional=True,
+            etag=True
         )
+        # Only full transfers count; 304 revalidations are repeat visits
+        if _counters is not None and response.status_code == 200:
+            _count_download(_download_source(request.args.get('src', 'unknown')))
+        return response
+    except NotFound:
+        return jsonify({'error': 'PDF not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -26,8 +78,20 @@ def download_13_body_types():
 def get_lead_magnet_stats():
     """Get lead magnet download statistics"""
     try:
-        # This would typically come from a database
-        # For now, return mock data
+        if _counters is not None:
+            today = date.today()
+            pipe = _counters.pipeline(transaction=False)
+            pipe.mget(_TOTAL_KEY, f'lm:dl:month:{today:%Y-%m}')
+            pipe.zrevrange(_SOURCES_KEY, 0, 0)
+            (total, this_month), top_source = pipe.execute()
+            return jsonify({
+                'total_downloads': int(total or 0),
+                'this_month': int(this_month or 0),
+                'conversion_rate': None,  # needs page-view tracking
+                'top_source': top_source[0].decode() if top_source else None
+            })
+        
+        # Without Redis there is nothing recorded, so return mock data
         stats = {
             'total_downloads': 1247,
             'this_month': 89,
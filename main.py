@@ -1,9 +1,50 @@
 import os
+import orjson
 from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from collections.abc import Mapping
 from datetime import datetime
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses with orjson instead of the stdlib encoder"""
+
+    # Let datetimes fall through to Flask's default handler so they keep the HTTP-date format
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def _option(self, indent=None):
+        option = self.options
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    @staticmethod
+    def default(o):
+        # Read-only views such as the knowledge base's cached MappingProxyType results
+        if isinstance(o, Mapping):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._option(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._option(indent)),
+            mimetype=self.mimetype
+        )
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.json.compact = True
+app.json.sort_keys = False
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
 CORS(app)
 
@@ -85,10 +126,3 @@ def favicon():
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
-```
-
----
-
-**Commit it, wait for deployment, then test:**
-```
-https://your-healing-guide-api.vercel.app
@@ -324,7 +324,7 @@ Format your response in clear sections for easy understanding."""
             if herb in response_lower:
                 herbs.append(herb.title())
         
-        return list(set(herbs))  # Remove duplicates
+        return list(dict.fromkeys(herbs))  # Remove duplicates, keeping order
     
     def _extract_lifestyle_tips(self, response: str) -> List[str]:
         """Extract lifestyle recommendations from response"""
@@ -9,6 +9,8 @@ speech_generation_bp = Blueprint('speech_generation', __name__)
 
 ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY', 'sk_5187fe66a968b74029c2a3fc057ad2b07def51b48fc60239')
 DR_HELEN_VOICE_ID = os.getenv('DR_HELEN_VOICE_ID', 'dj4xxt8wpTWpR9yAZcfn')
+# (connect, read) seconds, so a stalled ElevenLabs connection cannot wedge a worker
+ELEVENLABS_TIMEOUT = (3.05, 30)
 
 @speech_generation_bp.route('/generate-speech', methods=['POST'])
 def generate_speech():
@@ -46,7 +48,7 @@ def generate_speech():
         }
         
         # Make request to ElevenLabs
-        response = requests.post(url, json=payload, headers=headers)
+        response = requests.post(url, json=payload, headers=headers, timeout=ELEVENLABS_TIMEOUT)
         
         if response.status_code == 200:
             # Return audio data
@@ -95,7 +97,7 @@ def test_voice():
             }
         }
         
-        response = requests.post(url, json=payload, headers=headers)
+        response = requests.post(url, json=payload, headers=headers, timeout=ELEVENLABS_TIMEOUT)
         
         if response.status_code == 200:
             return Response(
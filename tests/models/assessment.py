@@ -0,0 +1,57 @@
+import json
+from datetime import datetime
+
+from .user import db
+
+
+class Assessment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer)
+    email = db.Column(db.String(120))
+    constitution = db.Column(db.String(50))
+    secondary_constitution = db.Column(db.String(50))
+    primary_dosha = db.Column(db.String(20))
+    scores = db.Column(db.Text)
+    answers = db.Column(db.Text)
+    recommendations = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def set_scores(self, scores):
+        self.scores = json.dumps(scores)
+
+    def set_answers(self, answers):
+        self.answers = json.dumps(answers)
+
+    def set_recommendations(self, recommendations):
+        self.recommendations = json.dumps(recommendations)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'constitution': self.constitution,
+            'secondary_constitution': self.secondary_constitution,
+            'scores': json.loads(self.scores) if self.scores else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class NewsletterSubscription(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    name = db.Column(db.String(100))
+    source = db.Column(db.String(50))
+    subscription_source = db.Column(db.String(50))
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    subscribed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    unsubscribed_at = db.Column(db.DateTime)
+
+
+class LibraryContent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200))
+    category = db.Column(db.String(50))
+    is_published = db.Column(db.Boolean, default=True)
+
+    def to_dict(self):
+        return {'id': self.id, 'title': self.title, 'category': self.category}
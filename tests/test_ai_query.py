@@ -0,0 +1,16 @@
+import pytest
+
+from src.routes.ai_query import ai_query_bp
+
+
+@pytest.fixture
+def ai_client(app, client):
+    app.register_blueprint(ai_query_bp, url_prefix='/api')
+    return client
+
+
+def test_ask_with_null_email_requires_subscription(ai_client):
+    response = ai_client.post('/api/ask', json={'query': 'What should I eat?', 'email': None})
+
+    assert response.status_code == 403
+    assert response.get_json()['error'] == 'Subscription required'
@@ -0,0 +1,60 @@
+from itertools import product
+
+import pytest
+
+from src.routes.assessment import calculate_constitution
+
+
+def answers_for(vata=0, pitta=0, kapha=0):
+    """One answer per question, picking the vata, pitta or kapha option (3 points each)"""
+    options = [0] * vata + [1] * pitta + [2] * kapha
+    return [{'question_id': question_id, 'option_index': option}
+            for question_id, option in enumerate(options, start=1)]
+
+
+def baseline_constitution(scores):
+    """The original float-threshold scoring, kept as the reference"""
+    primary = max(scores, key=scores.get)
+    sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    secondary = None
+    if sorted_scores[1][1] >= sorted_scores[0][1] * 0.8:
+        secondary = sorted_scores[1][0]
+    return f"{primary}-{secondary}" if secondary else primary
+
+
+def test_no_points_is_single_vata():
+    # Deliberate change: the baseline reported 'vata-pitta' when nothing scored
+    result = calculate_constitution([])
+
+    assert result['scores'] == {'vata': 0, 'pitta': 0, 'kapha': 0}
+    assert result['secondary'] is None
+    assert result['constitution'] == 'vata'
+
+
+@pytest.mark.parametrize('counts, expected', [
+    ((3, 3, 0), 'vata-pitta'),
+    ((3, 0, 3), 'vata-kapha'),
+    ((0, 3, 3), 'pitta-kapha'),
+    ((3, 3, 3), 'vata-pitta'),
+    ((1, 3, 3), 'pitta-kapha'),
+])
+def test_ties_go_to_the_earlier_dosha(counts, expected):
+    assert calculate_constitution(answers_for(*counts))['constitution'] == expected
+
+
+@pytest.mark.parametrize('counts, expected', [
+    ((5, 4, 0), 'vata-pitta'),  # exactly 80%
+    ((5, 3, 0), 'vata'),
+    ((0, 4, 5), 'kapha-pitta'),
+    ((0, 3, 5), 'kapha'),
+])
+def test_secondary_threshold_is_inclusive_at_80_percent(counts, expected):
+    assert calculate_constitution(answers_for(*counts))['constitution'] == expected
+
+
+def test_matches_baseline_whenever_anything_scores():
+    for counts in product(range(11), repeat=3):
+        if sum(counts) == 0 or sum(counts) > 10:
+            continue
+        result = calculate_constitution(answers_for(*counts))
+        assert result['constitution'] == baseline_constitution(result['scores']), counts
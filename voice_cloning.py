@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify
 from werkzeug.utils import secure_filename
 import os
 import tempfile
@@ -18,6 +18,14 @@ ALLOWED_EXTENSIONS = {'wav', 'mp3', 'm4a', 'flac'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def _audio_response(audio_stream, download_name):
+    """Stream MP3 chunks to the client as a download (chunked transfer, no temp file)"""
+    return Response(
+        audio_stream,
+        mimetype='audio/mpeg',
+        headers={'Content-Disposition': f'attachment; filename={download_name}'}
+    )
+
 @voice_cloning_bp.route('/upload-voice-sample', methods=['POST'])
 def upload_voice_sample():
     """Upload voice sample for cloning Dr. Helen's voice"""
@@ -38,15 +46,11 @@ def upload_voice_sample():
         file_path = os.path.join(temp_dir, filename)
         file.save(file_path)
         
-        # Read the file for ElevenLabs upload
-        with open(file_path, 'rb') as audio_file:
-            audio_data = audio_file.read()
-        
-        # Create voice clone
+        # Create voice clone; the sample is streamed from disk during upload
         voice_id = elevenlabs_service.create_voice_clone(
             name=DR_HELEN_VOICE_CONFIG["name"],
             description=DR_HELEN_VOICE_CONFIG["description"],
-            audio_files=[audio_data]
+            audio_files=[file_path]
         )
         
         # Clean up temporary file
@@ -88,24 +92,15 @@ def generate_speech():
             return jsonify({'error': 'No voice ID available. Please upload voice sample first.'}), 400
         
         # Generate speech
-        audio_data = elevenlabs_service.generate_speech(
+        audio_stream = elevenlabs_service.generate_speech(
             text=text,
             voice_id=voice_id,
             model_id=DR_HELEN_VOICE_CONFIG["model_id"]
         )
         
-        if audio_data:
-            # Save to temporary file and return
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-            temp_file.write(audio_data)
-            temp_file.close()
-            
-            return send_file(
-                temp_file.name,
-                as_attachment=True,
-                download_name='dr_helen_speech.mp3',
-                mimetype='audio/mpeg'
-            )
+        if audio_stream is not None:
+            # Relay audio to the client as ElevenLabs produces it
+            return _audio_response(audio_stream, 'dr_helen_speech.mp3')
         else:
             return jsonify({'error': 'Failed to generate speech'}), 500
             
@@ -158,23 +153,14 @@ def test_voice(voice_id):
     try:
         test_text = "Hello, I'm Dr. Helen Thomas, DC. Welcome to Your Healing Guide, where ancient wisdom meets modern healing."
         
-        audio_data = elevenlabs_service.generate_speech(
+        audio_stream = elevenlabs_service.generate_speech(
             text=test_text,
             voice_id=voice_id,
             model_id=DR_HELEN_VOICE_CONFIG["model_id"]
         )
         
-        if audio_data:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-            temp_file.write(audio_data)
-            temp_file.close()
-            
-            return send_file(
-                temp_file.name,
-                as_attachment=True,
-                download_name='voice_test.mp3',
-                mimetype='audio/mpeg'
-            )
+        if audio_stream is not None:
+            return _audio_response(audio_stream, 'voice_test.mp3')
         else:
             return jsonify({'error': 'Failed to generate test audio'}), 500
             